@@ -0,0 +1,55 @@
+"""
+Stateless batch prediction API endpoints.
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+import time
+
+from app.schemas import BatchPredictRequest, BatchPredictResponse, BatchPredictItem
+from app.ml.model import PhishingDetector, get_detector
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/batch", response_model=BatchPredictResponse)
+async def predict_batch(
+    request: BatchPredictRequest,
+    detector: PhishingDetector = Depends(get_detector)
+):
+    """
+    Score several URLs with one model call.
+    
+    Uses lexical features only (no whitelist, network enrichment or
+    heuristics) and stores nothing; use /api/v1/url/check for full checks.
+    """
+    try:
+        start_time = time.time()
+        
+        urls = [url.lower().strip() for url in request.urls]
+        
+        # Feature extraction and the model call are CPU-bound
+        predictions = await run_in_threadpool(detector.predict_batch, urls)
+        
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        logger.info("Batch prediction complete: %d URLs in %dms", len(urls), processing_time_ms)
+        
+        return BatchPredictResponse(
+            results=[
+                BatchPredictItem(
+                    url=url,
+                    verdict=prediction["verdict"],
+                    confidence=prediction["confidence"],
+                    model_version=prediction["model_version"],
+                    top_features=prediction["top_features"]
+                )
+                for url, prediction in zip(urls, predictions)
+            ],
+            processing_time_ms=processing_time_ms
+        )
+        
+    except Exception as e:
+        logger.error("Batch prediction failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to score URLs: {str(e)}")
@@ -1,20 +1,28 @@
 """
 URL check API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+from uuid import UUID
+import asyncio
 import time
 from urllib.parse import urlparse
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.schemas import (
-    URLCheckRequest, URLCheckResponse, URLCheckResult,
-    URLCheckDetail, SearchParams, SearchResult, StatsResponse
+    URLCheckRequest, URLCheckResponse, URLCheckResult, URLCheckBatchRequest,
+    URLCheckBatchResponse, URLCheckStreamRequest, URLCheckStreamResult, URLCheckDetail,
+    SearchCursor, SearchParams, SearchResult, StatsResponse
 )
 from app.models import URLCheck, Enrichment
-from app.ml.model import get_detector
+from app.ml.model import PhishingDetector, get_detector
+from app.services.prediction import apply_prediction
+from app.tasks.scoring import score_url
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,63 +30,257 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _check_result(url_check: URLCheck) -> URLCheckResult:
+    """Build the public result for a stored check."""
+    return URLCheckResult(
+        check_id=url_check.id,
+        url=url_check.submitted_url,
+        verdict=url_check.verdict,
+        confidence=url_check.confidence,
+        model_version=url_check.model_version,
+        top_features=url_check.top_features or [],
+        enrichments=[],  # Empty for MVP, will add in Phase 5
+        additional_info=url_check.additional_info,
+        processing_time_ms=url_check.processing_time_ms,
+        timestamp=url_check.created_at
+    )
+
+
+def _new_check(submitted_url: str, client_host: Optional[str]) -> URLCheck:
+    """Build a pending URLCheck row for a submitted URL."""
+    normalized_url = submitted_url.lower().strip()
+    return URLCheck(
+        submitted_url=submitted_url,
+        normalized_url=normalized_url,
+        domain=urlparse(normalized_url).netloc,
+        ip_address=client_host,
+        verdict="pending",
+        confidence=0.0,
+        model_version=settings.MODEL_VERSION
+    )
+
+
+async def _score_check(url_check: URLCheck, detector: PhishingDetector, use_cache: bool) -> None:
+    """Score a pending URLCheck in-process and fill in its result."""
+    start_time = time.time()
+    
+    # Network lookups run concurrently inside predict
+    prediction = await detector.predict(url_check.normalized_url, None, use_cache=use_cache)
+    
+    apply_prediction(url_check, prediction)
+    url_check.processing_time_ms = int((time.time() - start_time) * 1000)
+
+
 @router.post("/check", response_model=URLCheckResponse)
 async def check_url(
     request: URLCheckRequest,
     http_request: Request,
-    db: Session = Depends(get_db)
+    no_cache: bool = False,
+    wait: bool = False,
+    db: Session = Depends(get_db),
+    detector: PhishingDetector = Depends(get_detector)
 ):
     """
     Submit a URL for phishing detection.
-    Returns immediately with check_id, processing happens synchronously for MVP.
+    With USE_CELERY the row is stored as pending and scored by a worker;
+    otherwise the URL is scored before responding.
+    Pass ?no_cache=1 to bypass the prediction result cache, and ?wait=true
+    to get the scored result inline instead of a follow-up GET.
     """
     try:
-        start_time = time.time()
-        
-        # Normalize URL
-        normalized_url = request.url.lower().strip()
+        url_check = _new_check(request.url, http_request.client.host if http_request.client else None)
         
-        # Get ML detector
-        detector = get_detector()
-        
-        # Predict (synchronous for MVP, will be async with Celery in Phase 5)
-        prediction = detector.predict(normalized_url, enrichment_data=None)
-        
-        # Calculate processing time
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        if settings.USE_CELERY:
+            db.add(url_check)
+            db.commit()
+            db.refresh(url_check)
+            
+            score_url.delay(str(url_check.id), url_check.normalized_url, use_cache=not no_cache)
+            logger.info("URL check queued: %s", url_check.id)
+            
+            return URLCheckResponse(
+                check_id=url_check.id,
+                status="processing",
+                estimated_time_seconds=5
+            )
         
-        # Save to database
-        url_check = URLCheck(
-            submitted_url=request.url,
-            normalized_url=normalized_url,
-            ip_address=http_request.client.host if http_request.client else None,
-            verdict=prediction["verdict"],
-            confidence=prediction["confidence"],
-            model_version=prediction["model_version"],
-            processing_time_ms=processing_time_ms
-        )
+        await _score_check(url_check, detector, use_cache=not no_cache)
         
         db.add(url_check)
         db.commit()
         db.refresh(url_check)
         
-        logger.info(f"URL check complete: {url_check.id} - {prediction['verdict']} ({prediction['confidence']:.2f})")
+        logger.info("URL check complete: %s - %s (%.2f)", url_check.id, url_check.verdict, url_check.confidence)
         
         return URLCheckResponse(
             check_id=url_check.id,
             status="complete",
-            estimated_time_seconds=0
+            estimated_time_seconds=0,
+            result=_check_result(url_check) if wait else None
         )
         
     except Exception as e:
-        logger.error(f"URL check failed: {e}")
+        logger.error("URL check failed: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to process URL: {str(e)}")
 
 
+@router.post("/check_batch", response_model=URLCheckBatchResponse)
+async def check_url_batch(
+    request: URLCheckBatchRequest,
+    http_request: Request,
+    no_cache: bool = False,
+    db: Session = Depends(get_db),
+    detector: PhishingDetector = Depends(get_detector)
+):
+    """
+    Run full checks for several URLs in one request.
+    URLs are scored in-process concurrently and stored in one commit;
+    results come back in request order.
+    """
+    try:
+        client_host = http_request.client.host if http_request.client else None
+        url_checks = [_new_check(url, client_host) for url in request.urls]
+        
+        await asyncio.gather(*(_score_check(url_check, detector, use_cache=not no_cache) for url_check in url_checks))
+        
+        # ids and timestamps are client-side defaults, so a flush is
+        # enough to build the results without refreshing each row
+        db.add_all(url_checks)
+        db.flush()
+        results = [_check_result(url_check) for url_check in url_checks]
+        db.commit()
+        
+        logger.info("Batch URL check complete: %d URLs", len(url_checks))
+        
+        return URLCheckBatchResponse(results=results)
+        
+    except Exception as e:
+        logger.error("Batch URL check failed: %s", e)
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to process URLs: {str(e)}")
+
+
+@router.websocket("/ws")
+async def check_url_stream(
+    websocket: WebSocket,
+    db: Session = Depends(get_db),
+    detector: PhishingDetector = Depends(get_detector)
+):
+    """
+    Check URLs over one WebSocket connection.
+    Each text frame is a URLCheckStreamRequest; every URL is scored in-process
+    as soon as it arrives and a URLCheckStreamResult is pushed back when done,
+    so results may arrive out of order (match them by ref).
+    """
+    await websocket.accept()
+    client_host = websocket.client.host if websocket.client else None
+    send_lock = asyncio.Lock()
+    pending = set()
+    
+    async def send(message: URLCheckStreamResult):
+        async with send_lock:
+            await websocket.send_text(message.model_dump_json())
+    
+    def cancel_pending():
+        current = asyncio.current_task()
+        for task in list(pending):
+            if task is not current:
+                task.cancel()
+    
+    async def handle(request: URLCheckStreamRequest):
+        try:
+            url_check = _new_check(request.url, client_host)
+            await _score_check(url_check, detector, use_cache=True)
+            
+            # No awaits between add and refresh, so concurrent handlers
+            # never interleave on the shared session
+            db.add(url_check)
+            db.commit()
+            db.refresh(url_check)
+            message = URLCheckStreamResult(ref=request.ref, result=_check_result(url_check))
+        except Exception as e:
+            logger.error("Streamed URL check failed: %s", e)
+            db.rollback()
+            message = URLCheckStreamResult(ref=request.ref, error=f"Failed to process URL: {str(e)}")
+        try:
+            await send(message)
+        except Exception as e:
+            # Client went away mid-stream; the other results have nowhere to go
+            logger.info("Stream client disconnected: %s", e)
+            cancel_pending()
+    
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                request = URLCheckStreamRequest.model_validate_json(text)
+            except ValidationError as e:
+                await send(URLCheckStreamResult(error=str(e)))
+                continue
+            
+            task = asyncio.create_task(handle(request))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    except (WebSocketDisconnect, RuntimeError):
+        cancel_pending()
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats(db: Session = Depends(get_db)):
+    """Get aggregate statistics."""
+    try:
+        # Verdict distribution, average confidence and date range in one scan
+        verdict_rows = db.query(
+            URLCheck.verdict,
+            func.count(URLCheck.id),
+            func.sum(URLCheck.confidence),
+            func.min(URLCheck.created_at),
+            func.max(URLCheck.created_at)
+        ).group_by(URLCheck.verdict).all()
+        
+        verdict_distribution = {verdict: count for verdict, count, _, _, _ in verdict_rows}
+        total_checks = sum(verdict_distribution.values())
+        
+        confidence_sum = sum(row[2] or 0.0 for row in verdict_rows)
+        avg_confidence = confidence_sum / total_checks if total_checks else 0.0
+        
+        first_check = min((row[3] for row in verdict_rows if row[3]), default=None)
+        last_check = max((row[4] for row in verdict_rows if row[4]), default=None)
+        
+        # Top domains
+        top_domains_query = db.query(
+            URLCheck.domain,
+            func.count(URLCheck.id).label('count')
+        ).filter(URLCheck.domain.isnot(None)) \
+         .group_by(URLCheck.domain) \
+         .order_by(func.count(URLCheck.id).desc()) \
+         .limit(10).all()
+        
+        top_domains = [
+            {"domain": domain, "count": count}
+            for domain, count in top_domains_query
+        ]
+        
+        return StatsResponse(
+            total_checks=total_checks,
+            verdict_distribution=verdict_distribution,
+            top_domains=top_domains,
+            avg_confidence=float(avg_confidence),
+            date_range={
+                "first": first_check or datetime.utcnow(),
+                "last": last_check or datetime.utcnow()
+            }
+        )
+        
+    except Exception as e:
+        logger.error("Stats failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{check_id}", response_model=URLCheckResult)
 async def get_check_result(
-    check_id: str,
+    check_id: UUID,
     db: Session = Depends(get_db)
 ):
     """Get result of a URL check by ID."""
@@ -88,33 +290,18 @@ async def get_check_result(
         if not url_check:
             raise HTTPException(status_code=404, detail="Check not found")
         
-        # Get top features from model
-        detector = get_detector()
-        prediction = detector.predict(url_check.normalized_url, enrichment_data=None)
-        
-        return URLCheckResult(
-            check_id=url_check.id,
-            url=url_check.submitted_url,
-            verdict=url_check.verdict,
-            confidence=url_check.confidence,
-            model_version=url_check.model_version,
-            top_features=prediction["top_features"],
-            enrichments=[],  # Empty for MVP, will add in Phase 5
-            additional_info=prediction.get("additional_info"),
-            processing_time_ms=url_check.processing_time_ms,
-            timestamp=url_check.created_at
-        )
+        return _check_result(url_check)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get check result: {e}")
+        logger.error("Failed to get check result: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{check_id}/detail", response_model=URLCheckDetail)
 async def get_check_detail(
-    check_id: str,
+    check_id: UUID,
     db: Session = Depends(get_db)
 ):
     """Get detailed result including all features and enrichments."""
@@ -124,10 +311,6 @@ async def get_check_detail(
         if not url_check:
             raise HTTPException(status_code=404, detail="Check not found")
         
-        # Get full prediction with all features
-        detector = get_detector()
-        prediction = detector.predict(url_check.normalized_url, enrichment_data=None)
-        
         # Get enrichments
         enrichments = db.query(Enrichment).filter(
             Enrichment.url_check_id == check_id
@@ -148,26 +331,27 @@ async def get_check_detail(
             verdict=url_check.verdict,
             confidence=url_check.confidence,
             model_version=url_check.model_version,
-            top_features=prediction["top_features"],
+            top_features=url_check.top_features or [],
             enrichments=[],
-            additional_info=prediction.get("additional_info"),
+            additional_info=url_check.additional_info,
             processing_time_ms=url_check.processing_time_ms,
             timestamp=url_check.created_at,
             raw_enrichments=raw_enrichments,
-            all_features=prediction["all_features"]
+            all_features=url_check.all_features
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get check detail: {e}")
+        logger.error("Failed to get check detail: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/search", response_model=SearchResult)
 async def search_checks(
     params: SearchParams,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    detector: PhishingDetector = Depends(get_detector)
 ):
     """Search and filter URL checks."""
     try:
@@ -175,7 +359,7 @@ async def search_checks(
         
         # Apply filters
         if params.domain:
-            query = query.filter(URLCheck.normalized_url.contains(params.domain))
+            query = query.filter(URLCheck.domain == params.domain.lower().strip())
         
         if params.verdict:
             query = query.filter(URLCheck.verdict == params.verdict)
@@ -186,29 +370,57 @@ async def search_checks(
         if params.end_date:
             query = query.filter(URLCheck.created_at <= params.end_date)
         
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        results = query.order_by(URLCheck.created_at.desc()) \
-            .offset(params.offset) \
-            .limit(params.limit) \
+        # Keyset pagination on (created_at, id): later pages continue strictly
+        # below the previous page's last row (id breaks created_at ties), so
+        # they need neither an offset nor a count
+        if params.cursor:
+            query = query.filter(
+                tuple_(URLCheck.created_at, URLCheck.id) < tuple_(params.cursor.created_at, params.cursor.id)
+            )
+            total = None
+            offset = 0
+        else:
+            total = query.count()
+            offset = params.offset
+        
+        # Fetch one extra row to know whether another page exists
+        results = query.order_by(URLCheck.created_at.desc(), URLCheck.id.desc()) \
+            .offset(offset) \
+            .limit(params.limit + 1) \
             .all()
         
+        has_more = len(results) > params.limit
+        results = results[:params.limit]
+        next_cursor = SearchCursor(created_at=results[-1].created_at, id=results[-1].id) if has_more else None
+        
+        # Rows stored before explanations were persisted are scored in one
+        # batch and written back, so each legacy row is only scored once.
+        # Pending rows belong to a worker; the write is also conditional so
+        # a worker that finished in the meantime keeps its explanation
+        missing = [r for r in results if r.top_features is None and r.verdict != "pending"]
+        if missing:
+            predictions = detector.predict_batch([r.normalized_url for r in missing])
+            for url_check, prediction in zip(missing, predictions):
+                db.query(URLCheck).filter(
+                    URLCheck.id == url_check.id,
+                    URLCheck.top_features.is_(None)
+                ).update({
+                    URLCheck.top_features: prediction["top_features"],
+                    URLCheck.all_features: prediction["all_features"]
+                }, synchronize_session=False)
+            db.commit()
+        
         # Convert to response format
         url_results = []
-        detector = get_detector()
         
         for url_check in results:
-            prediction = detector.predict(url_check.normalized_url, enrichment_data=None)
-            
             url_results.append(URLCheckResult(
                 check_id=url_check.id,
                 url=url_check.submitted_url,
                 verdict=url_check.verdict,
                 confidence=url_check.confidence,
                 model_version=url_check.model_version,
-                top_features=prediction["top_features"][:3],  # Top 3 for list view
+                top_features=(url_check.top_features or [])[:3],  # Top 3 for list view
                 enrichments=[],
                 processing_time_ms=url_check.processing_time_ms,
                 timestamp=url_check.created_at
@@ -216,60 +428,10 @@ async def search_checks(
         
         return SearchResult(
             total=total,
-            results=url_results
-        )
-        
-    except Exception as e:
-        logger.error(f"Search failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/stats", response_model=StatsResponse)
-async def get_stats(db: Session = Depends(get_db)):
-    """Get aggregate statistics."""
-    try:
-        # Total checks
-        total_checks = db.query(URLCheck).count()
-        
-        # Verdict distribution
-        verdicts = db.query(
-            URLCheck.verdict,
-            db.func.count(URLCheck.id)
-        ).group_by(URLCheck.verdict).all()
-        
-        verdict_distribution = {verdict: count for verdict, count in verdicts}
-        
-        # Top domains
-        top_domains_query = db.query(
-            URLCheck.normalized_url,
-            db.func.count(URLCheck.id).label('count')
-        ).group_by(URLCheck.normalized_url) \
-         .order_by(db.func.count(URLCheck.id).desc()) \
-         .limit(10).all()
-        
-        top_domains = [
-            {"domain": urlparse(url).netloc, "count": count}
-            for url, count in top_domains_query
-        ]
-        
-        # Average confidence
-        avg_confidence = db.query(db.func.avg(URLCheck.confidence)).scalar() or 0.0
-        
-        # Date range
-        first_check = db.query(db.func.min(URLCheck.created_at)).scalar()
-        last_check = db.query(db.func.max(URLCheck.created_at)).scalar()
-        
-        return StatsResponse(
-            total_checks=total_checks,
-            verdict_distribution=verdict_distribution,
-            top_domains=top_domains,
-            avg_confidence=float(avg_confidence),
-            date_range={
-                "first": first_check or datetime.utcnow(),
-                "last": last_check or datetime.utcnow()
-            }
+            results=url_results,
+            next_cursor=next_cursor
         )
         
     except Exception as e:
-        logger.error(f"Stats failed: {e}")
+        logger.error("Search failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
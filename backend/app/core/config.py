@@ -13,6 +13,9 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./phishing_detector.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # seconds
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -20,6 +23,7 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    USE_CELERY: bool = False  # Score URLs on Celery workers instead of in-process
     
     # API Keys
     GOOGLE_SAFE_BROWSING_API_KEY: Optional[str] = None
@@ -28,7 +32,9 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     API_KEY_HEADER: str = "X-API-Key"
-    ALLOWED_ORIGINS: list = ["http://localhost:4200", "chrome-extension://*"]
+    ALLOWED_ORIGINS: list = ["http://localhost:4200"]
+    # CORS does not glob-match allow_origins, so extension origins use a regex
+    ALLOWED_ORIGIN_REGEX: Optional[str] = r"chrome-extension://[a-p]{32}"
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 10
@@ -37,6 +43,25 @@ class Settings(BaseSettings):
     MODEL_PATH: str = "../models/trained/model_v1.0.0.pkl"
     SCALER_PATH: str = "../models/trained/scaler_v1.0.0.pkl"
     MODEL_VERSION: str = "v1.0.0"
+    PREDICTION_CACHE_SIZE: int = 10000  # URLs whose model scores are memoized
+    RESULT_CACHE_SIZE: int = 50000  # Full predict() results kept for RESULT_CACHE_TTL
+    RESULT_CACHE_TTL: int = 300  # seconds
+    
+    # Enrichment
+    GEOIP_DB_PATH: str = "../models/GeoLite2-Country.mmdb"  # Offline geo lookups; ip-api is used if missing
+    # In-process lookup caches (seconds); failed lookups use the shorter *_NEGATIVE TTL
+    CACHE_TTL_WHOIS: int = 86400
+    CACHE_TTL_WHOIS_NEGATIVE: int = 3600
+    CACHE_TTL_DNS: int = 300
+    CACHE_TTL_DNS_NEGATIVE: int = 60
+    CACHE_TTL_IP_GEO: int = 3600
+    CACHE_TTL_IP_GEO_NEGATIVE: int = 300
+    # Whitelist cache prewarm at startup: wait DELAY seconds, then enrich one
+    # domain every INTERVAL seconds
+    WHITELIST_PREWARM: bool = True
+    WHITELIST_PREWARM_DELAY: float = 30.0
+    WHITELIST_PREWARM_INTERVAL: float = 2.0
+    BACKGROUND_LOOKUP_WORKERS: int = 2  # Threads for background/prewarm WHOIS and getaddrinfo
     
     # Features
     USE_MOCK_APIS: bool = False
@@ -3,11 +3,12 @@ FastAPI application for URL Phishing Detection.
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api.endpoints import url_check
+from app.api.endpoints import url_check, predict
 
 # Configure logging
 logging.basicConfig(
@@ -23,13 +24,15 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="ML-based URL phishing detection system with threat intelligence enrichment"
+    description="ML-based URL phishing detection system with threat intelligence enrichment",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
+    allow_origin_regex=settings.ALLOWED_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -41,13 +44,18 @@ app.include_router(
     prefix="/api/v1/url",
     tags=["URL Check"]
 )
+app.include_router(
+    predict.router,
+    prefix="/api/v1/predict",
+    tags=["Prediction"]
+)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup."""
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Model version: {settings.MODEL_VERSION}")
+    logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
+    logger.info("Model version: %s", settings.MODEL_VERSION)
     
     # Pre-load ML model
     try:
@@ -55,14 +63,29 @@ async def startup_event():
         detector = get_detector()
         logger.info("✅ ML model loaded successfully")
     except Exception as e:
-        logger.error(f"❌ Failed to load ML model: {e}")
+        logger.error("❌ Failed to load ML model: %s", e)
         logger.warning("API will start but predictions will fail")
+        return
+    
+    # Warm up JIT/model code paths so the first request is not slow
+    try:
+        detector.warmup()
+        logger.info("✅ Model warmed up")
+    except Exception as e:
+        logger.warning("Model warmup failed: %s", e)
+    
+    # Fill the enrichment caches for whitelisted domains in the background,
+    # so whitelisted checks can report them without any network wait
+    detector.schedule_whitelist_prewarm()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down application")
+    
+    from app.ml.model import get_detector
+    await get_detector().aclose()
 
 
 @app.get("/")
@@ -0,0 +1,134 @@
+"""
+Compact tree-ensemble layout for fast, compiler-free inference.
+
+A fitted sklearn forest keeps every node as float64 thresholds and int64
+indices spread over one Tree object per estimator. CompactForest packs all
+trees into flat structure-of-arrays buffers (float32 thresholds, int16
+features, int32 children, float32 leaf probabilities) and traverses them
+with a Numba kernel, so prediction touches a fraction of the memory and
+needs no C toolchain.
+
+No app.* imports: train.py imports this module as a script sibling.
+"""
+from pathlib import Path
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import Numba (JIT-compiled tree traversal)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba not found. Compact forest inference disabled.")
+
+TREE_LEAF = -1
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True)
+    def forest_predict_proba(X, feature, threshold, left, right, value, roots):
+        """
+        Average leaf class probabilities over all trees for each row of X.
+        
+        Rows are processed in parallel (each row owns its output slot, so
+        no reduction across threads is needed); trees are walked in order.
+        """
+        n_samples = X.shape[0]
+        n_trees = roots.shape[0]
+        out = np.zeros((n_samples, value.shape[1]), dtype=np.float64)
+        
+        for i in prange(n_samples):
+            for t in range(n_trees):
+                node = roots[t]
+                while left[node] != TREE_LEAF:
+                    if X[i, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                for k in range(value.shape[1]):
+                    out[i, k] += value[node, k]
+            for k in range(value.shape[1]):
+                out[i, k] /= n_trees
+        
+        return out
+
+
+class CompactForest:
+    """Flat structure-of-arrays copy of a fitted sklearn forest."""
+    
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+    
+    def __init__(self, feature, threshold, left, right, value, roots):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+    
+    @classmethod
+    def from_sklearn(cls, model) -> "CompactForest":
+        """
+        Pack a fitted RandomForestClassifier (or any forest of
+        DecisionTreeClassifiers) into flat arrays.
+        
+        Child indices are rebased to global node ids, and leaf values are
+        normalized to class probabilities as in DecisionTree.predict_proba.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == TREE_LEAF
+            
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, TREE_LEAF, tree.children_left + offset))
+            rights.append(np.where(is_leaf, TREE_LEAF, tree.children_right + offset))
+            
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            values.append(np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0))
+            
+            roots.append(offset)
+            offset += tree.node_count
+        
+        # sklearn compares float32 inputs against float64 thresholds; round
+        # each threshold down to the largest float32 <= it so x <= t is
+        # decided exactly as before for every float32 x
+        threshold64 = np.concatenate(thresholds)
+        threshold32 = threshold64.astype(np.float32)
+        rounded_up = threshold32.astype(np.float64) > threshold64
+        threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+        
+        return cls(
+            feature=np.concatenate(features).astype(np.int16),
+            threshold=threshold32,
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values).astype(np.float32),
+            roots=np.asarray(roots, dtype=np.int32)
+        )
+    
+    def predict_proba(self, X) -> "np.ndarray":
+        """Class probabilities for each row of X, in model.classes_ order."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return forest_predict_proba(
+            X, self.feature, self.threshold, self.left, self.right, self.value, self.roots
+        )
+    
+    def save(self, path: Path):
+        """Write the arrays to an uncompressed .npz file."""
+        with open(path, "wb") as f:
+            np.savez(f, **{name: getattr(self, name) for name in self.ARRAYS})
+    
+    @classmethod
+    def load(cls, path: Path) -> "CompactForest":
+        """Read arrays written by save()."""
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in cls.ARRAYS})
@@ -7,7 +7,7 @@ This module implements 25 features across 4 categories:
 - Content-based features (3): Page content analysis (optional)
 - Threat-intel features (4): External threat intelligence
 """
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse
 import re
 import math
 from collections import Counter
@@ -16,6 +16,125 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Try to import numpy (batch extraction)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.info("numpy not found. Batch feature extraction disabled.")
+
+# Try to import pandas (column-wise lexical features for training)
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    logger.info("pandas not found. Vectorized lexical features disabled.")
+
+# Try to import Numba (JIT-compiled lexical kernel)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba not found. Using pure-Python lexical features.")
+
+# Try to import pyahocorasick (multi-keyword matching automaton)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.info("pyahocorasick not found. Using regex keyword matching.")
+
+
+if NUMBA_AVAILABLE:
+    @njit
+    def entropy_kernel(buf):
+        """Shannon entropy of an ASCII byte buffer (256-bin histogram)."""
+        n = buf.shape[0]
+        if n == 0:
+            return 0.0
+        hist = np.zeros(256, dtype=np.int64)
+        for b in buf:
+            hist[b] += 1
+        # H = log2(n) - sum(c * log2(c)) / n, one log per occupied bin
+        weighted = 0.0
+        for count in hist:
+            if count > 0:
+                weighted += count * np.log2(count)
+        return np.log2(n) - weighted / n
+    
+    @njit
+    def lexical_kernel(url_buf, host_buf):
+        """
+        Character-level lexical statistics over ASCII byte buffers.
+        
+        Returns [digit_count, hyphen_count, host_entropy]: one pass over the
+        URL for the counts, one pass over the host for a 256-bin histogram.
+        """
+        out = np.zeros(3, dtype=np.float64)
+        
+        for b in url_buf:
+            if 48 <= b <= 57:  # '0'-'9'
+                out[0] += 1
+            elif b == 45:  # '-'
+                out[1] += 1
+        
+        out[2] = entropy_kernel(host_buf)
+        return out
+    
+    @njit
+    def batch_entropy_kernel(buf, offsets):
+        """
+        Entropy of each string packed into one ASCII buffer.
+        
+        String i is buf[offsets[i]:offsets[i + 1]], so a whole column is
+        handled in a single call instead of one dispatch per string.
+        """
+        out = np.empty(offsets.shape[0] - 1, dtype=np.float64)
+        for i in range(out.shape[0]):
+            out[i] = entropy_kernel(buf[offsets[i]:offsets[i + 1]])
+        return out
+
+
+_JIT_WARMED_UP = False
+
+
+def _warm_up_kernels():
+    """Compile the Numba kernels once per process, before the first real URL."""
+    global _JIT_WARMED_UP
+    if _JIT_WARMED_UP or not NUMBA_AVAILABLE:
+        return
+    lexical_kernel(_ascii_buffer("http://warm-up.example/1"), _ascii_buffer("warm-up.example"))
+    batch_entropy_kernel(_ascii_buffer("ab"), np.array([0, 1, 2], dtype=np.int64))
+    _JIT_WARMED_UP = True
+
+
+def _ascii_buffer(s: str):
+    """View an ASCII string as a uint8 array."""
+    return np.frombuffer(s.encode('ascii'), dtype=np.uint8)
+
+
+def build_keyword_matcher(keywords):
+    """
+    Build a function returning the set of keywords that occur in a text.
+    
+    All keywords are matched in a single pass: with an Aho-Corasick
+    automaton when pyahocorasick is installed, otherwise with a precompiled
+    regex alternation (the lookahead lets overlapping keywords match).
+    """
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(text)}
+    
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+    return lambda text: set(pattern.findall(text))
+
 
 class FeatureExtractor:
     """Extract features from URLs for phishing detection."""
@@ -33,13 +152,24 @@ class FeatureExtractor:
         'buff.ly', 'is.gd', 'cli.gs', 'tiny.cc'
     ]
     
+    # Precompiled patterns (compiled once at import, shared by all instances)
+    _IPV4_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+    _IPV6_RE = re.compile(r'[0-9a-fA-F:]{10,}')
+    _match_suspicious = staticmethod(build_keyword_matcher(SUSPICIOUS_KEYWORDS))
+    
+    # Bump when feature definitions change (invalidates cached training features)
+    version = "1.0.0"
+    
+    # Lexical features (computed from the URL string alone)
+    LEXICAL_FEATURES = [
+        'url_length', 'domain_dots', 'hyphen_count', 'path_depth',
+        'query_param_count', 'digit_ratio', 'has_ip_address',
+        'char_entropy', 'suspicious_keywords', 'is_shortened'
+    ]
+    
     def __init__(self):
         """Initialize feature extractor."""
-        self.feature_names = [
-            # Lexical features
-            'url_length', 'domain_dots', 'hyphen_count', 'path_depth',
-            'query_param_count', 'digit_ratio', 'has_ip_address',
-            'char_entropy', 'suspicious_keywords', 'is_shortened',
+        self.feature_names = self.LEXICAL_FEATURES + [
             # Host-based features (placeholders for now, will be filled by enrichment)
             'domain_age_days', 'registration_length_years', 'has_https',
             'valid_ssl', 'cert_age_days', 'subdomain_count',
@@ -49,6 +179,8 @@ class FeatureExtractor:
             # Threat-intel features (from enrichment)
             'gsb_threat_type', 'vt_positives', 'in_phishing_list', 'ip_blocklisted'
         ]
+        # Pay the JIT compile cost here rather than on the first URL
+        _warm_up_kernels()
     
     def extract_all(self, url: str, enrichment_data: Optional[Dict] = None) -> Dict[str, float]:
         """
@@ -80,46 +212,81 @@ class FeatureExtractor:
             return features
             
         except Exception as e:
-            logger.error(f"Failed to extract features from {url}: {e}")
+            logger.error("Failed to extract features from %s: %s", url, e)
             # Return default features (all zeros)
             return {name: 0.0 for name in self.feature_names}
     
-    def _extract_lexical(self, url: str, parsed) -> Dict[str, float]:
-        """Extract lexical features from URL string."""
-        features = {}
-        
-        # 1. URL length
-        features['url_length'] = float(len(url))
-        
-        # 2. Number of dots in domain
-        features['domain_dots'] = float(parsed.netloc.count('.'))
-        
-        # 3. Number of hyphens
-        features['hyphen_count'] = float(url.count('-'))
-        
-        # 4. Path depth
-        path_parts = [p for p in parsed.path.split('/') if p]
-        features['path_depth'] = float(len(path_parts))
-        
-        # 5. Query parameter count
-        features['query_param_count'] = float(len(parse_qs(parsed.query)))
-        
-        # 6. Digit-to-character ratio
-        features['digit_ratio'] = self._digit_ratio(url)
+    def extract_batch(self, urls, out=None) -> "np.ndarray":
+        """
+        Extract lexical features for many URLs into a 2-D array.
         
-        # 7. Has IP address in host
-        features['has_ip_address'] = float(self._has_ip_address(parsed.netloc))
+        Rows are written straight into a preallocated float32 matrix (column
+        order matches feature_names) without building a dict per URL.
+        Enrichment-based columns are left at zero.
         
-        # 8. Character entropy
-        features['char_entropy'] = self._shannon_entropy(parsed.netloc)
+        Args:
+            urls: Iterable of URLs (list, pandas Series, ...)
+            out: Optional preallocated array of shape (len(urls), n_features)
+            
+        Returns:
+            Array of shape (len(urls), n_features)
+        """
+        urls = list(urls)
+        if out is None:
+            out = np.zeros((len(urls), len(self.feature_names)), dtype=np.float32)
+        else:
+            out[:] = 0
         
-        # 9. Suspicious keyword count
-        features['suspicious_keywords'] = float(self._count_suspicious_keywords(url))
+        n_lexical = len(self.LEXICAL_FEATURES)
+        for i, url in enumerate(urls):
+            try:
+                out[i, :n_lexical] = self._lexical_values(url, urlparse(url))
+            except Exception as e:
+                logger.error("Failed to extract features from %s: %s", url, e)
+                out[i, :n_lexical] = 0.0
         
-        # 10. Is shortened URL
-        features['is_shortened'] = float(self._is_shortened(parsed.netloc))
+        return out
+    
+    def _extract_lexical(self, url: str, parsed) -> Dict[str, float]:
+        """Extract lexical features from URL string."""
+        return dict(zip(self.LEXICAL_FEATURES, self._lexical_values(url, parsed)))
+    
+    def _lexical_values(self, url: str, parsed) -> tuple:
+        """Lexical feature values, in LEXICAL_FEATURES order."""
+        # Character-level stats: the JIT kernel handles ASCII URLs (the vast
+        # majority); anything else keeps the Unicode-aware Python helpers
+        if NUMBA_AVAILABLE and url.isascii():
+            digit_count, hyphen_count, char_entropy = lexical_kernel(
+                _ascii_buffer(url), _ascii_buffer(parsed.netloc)
+            )
+            digit_ratio = digit_count / len(url) if url else 0.0
+        else:
+            hyphen_count = float(url.count('-'))
+            digit_ratio = self._digit_ratio(url)
+            char_entropy = self._shannon_entropy(parsed.netloc)
         
-        return features
+        return (
+            # 1. URL length
+            float(len(url)),
+            # 2. Number of dots in domain
+            float(parsed.netloc.count('.')),
+            # 3. Number of hyphens
+            float(hyphen_count),
+            # 4. Path depth
+            float(len([p for p in parsed.path.split('/') if p])),
+            # 5. Query parameter count
+            float(self._query_param_count(parsed.query)),
+            # 6. Digit-to-character ratio
+            float(digit_ratio),
+            # 7. Has IP address in host
+            float(self._has_ip_address(parsed.netloc)),
+            # 8. Character entropy
+            float(char_entropy),
+            # 9. Suspicious keyword count
+            float(self._count_suspicious_keywords(url.lower())),
+            # 10. Is shortened URL
+            float(self._is_shortened(parsed.netloc)),
+        )
     
     def _extract_enriched(self, enrichment_data: Dict) -> Dict[str, float]:
         """Extract features from enrichment data."""
@@ -173,36 +340,51 @@ class FeatureExtractor:
     def _has_ip_address(self, domain: str) -> int:
         """Check if domain contains an IP address."""
         # IPv4 pattern
-        ipv4_pattern = r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
-        if re.search(ipv4_pattern, domain):
+        if self._IPV4_RE.search(domain):
             return 1
         
         # IPv6 pattern (simplified)
-        ipv6_pattern = r'[0-9a-fA-F:]{10,}'
-        if re.search(ipv6_pattern, domain):
+        if self._IPV6_RE.search(domain):
             return 1
         
         return 0
     
+    def _query_param_count(self, query: str) -> int:
+        """
+        Count distinct query keys that have a non-empty value.
+        
+        Matches len(parse_qs(query)), which the model was trained on, but
+        skips the dict and url-decoding (keys are compared undecoded).
+        """
+        if not query:
+            return 0
+        keys = set()
+        for pair in query.split('&'):
+            key, sep, value = pair.partition('=')
+            if sep and value:
+                keys.add(key)
+        return len(keys)
+    
     def _shannon_entropy(self, s: str) -> float:
         """
         Calculate Shannon entropy of a string.
         Higher entropy indicates more randomness.
+        
+        Used for non-ASCII hosts or when Numba is unavailable. Counter is
+        kept here: at host-name lengths it beats a numpy bincount, whose
+        per-call overhead only pays off inside the JIT kernel.
         """
-        if len(s) == 0:
+        n = len(s)
+        if n == 0:
             return 0.0
         
-        counts = Counter(s)
-        probs = [count / len(s) for count in counts.values()]
-        entropy = -sum(p * math.log2(p) for p in probs if p > 0)
-        
-        return entropy
+        # H = log2(n) - sum(c * log2(c)) / n avoids a division per symbol
+        weighted = sum(count * math.log2(count) for count in Counter(s).values())
+        return math.log2(n) - weighted / n
     
-    def _count_suspicious_keywords(self, url: str) -> int:
-        """Count suspicious keywords in URL."""
-        url_lower = url.lower()
-        count = sum(1 for keyword in self.SUSPICIOUS_KEYWORDS if keyword in url_lower)
-        return count
+    def _count_suspicious_keywords(self, url_lower: str) -> int:
+        """Count suspicious keywords in an already lower-cased URL."""
+        return len(self._match_suspicious(url_lower))
     
     def _is_shortened(self, domain: str) -> int:
         """Check if URL uses a shortener service."""
@@ -214,6 +396,96 @@ class FeatureExtractor:
         return self.feature_names.copy()
 
 
+# urlsplit() pieces as regexes: optional scheme, "//" + netloc, then the
+# path up to '?' or '#', and the query between the first '?' and '#'
+_NETLOC_RE = r'^(?:[A-Za-z][A-Za-z0-9+.\-]*:)?//([^/?#]*)'
+_PATH_RE = r'^(?:[A-Za-z][A-Za-z0-9+.\-]*:)?(?://[^/?#]*)?([^?#]*)'
+_QUERY_RE = r'^[^?#]*\?([^#]*)'
+# Query keys that carry a non-empty value (as counted by parse_qs)
+_QUERY_KEY_RE = r'(?:^|&)([^&=]*)=[^&]'
+# URLs the regexes would split differently from urlparse(), which strips
+# leading C0 controls/spaces, drops tabs and newlines, splits ;params off
+# the path and rejects malformed [IPv6] hosts
+_IRREGULAR_URL_RE = r'^[\x00-\x20]|[\t\r\n;\[\]]'
+
+
+def _column_entropy(strings: "pd.Series") -> "np.ndarray":
+    """Shannon entropy of each string in a Series."""
+    if NUMBA_AVAILABLE:
+        joined = ''.join(strings)
+        if joined.isascii():
+            # Pack the column into one buffer and hand it to the kernel
+            offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+            np.cumsum(strings.str.len().to_numpy(), out=offsets[1:])
+            return batch_entropy_kernel(_ascii_buffer(joined), offsets)
+    return np.fromiter(
+        map(_SINGLETON._shannon_entropy, strings), dtype=np.float64, count=len(strings)
+    )
+
+
+def vectorized_lexical_features(urls: "pd.Series") -> "pd.DataFrame":
+    """
+    Compute the lexical features for a whole column of URLs at once.
+    
+    Each feature is a pandas .str operation over the Series (one C-level
+    pass per feature) instead of a Python call per URL. Values match
+    FeatureExtractor.extract_batch; host entropy goes through one Numba
+    call per column, and distinct query keys and the keyword automaton
+    still run per URL. URLs that urlparse() would normalise first
+    (_IRREGULAR_URL_RE) are scored by extract_batch itself.
+    
+    Args:
+        urls: Series of URL strings
+        
+    Returns:
+        DataFrame with one row per URL and LEXICAL_FEATURES columns
+    """
+    urls = urls.fillna('').astype(str)
+    netloc = urls.str.extract(_NETLOC_RE, expand=False).fillna('')
+    path = urls.str.extract(_PATH_RE, expand=False).fillna('')
+    query = urls.str.extract(_QUERY_RE, expand=False).fillna('')
+    url_length = urls.str.len()
+    url_lower = urls.str.lower()
+    
+    columns = {
+        # 1. URL length
+        'url_length': url_length,
+        # 2. Number of dots in domain
+        'domain_dots': netloc.str.count(r'\.'),
+        # 3. Number of hyphens
+        'hyphen_count': urls.str.count('-'),
+        # 4. Path depth
+        'path_depth': path.str.count(r'[^/]+'),
+        # 5. Query parameter count
+        'query_param_count': query.str.findall(_QUERY_KEY_RE).map(lambda keys: len(set(keys))),
+        # 6. Digit-to-character ratio
+        'digit_ratio': (urls.str.count(r'\d') / url_length.where(url_length > 0)).fillna(0.0),
+        # 7. Has IP address in host
+        'has_ip_address': (
+            netloc.str.contains(FeatureExtractor._IPV4_RE.pattern)
+            | netloc.str.contains(FeatureExtractor._IPV6_RE.pattern)
+        ),
+        # 8. Character entropy
+        'char_entropy': _column_entropy(netloc),
+        # 9. Suspicious keyword count
+        'suspicious_keywords': url_lower.map(
+            lambda u: len(FeatureExtractor._match_suspicious(u))
+        ),
+        # 10. Is shortened URL
+        'is_shortened': netloc.str.lower().str.contains(
+            '|'.join(map(re.escape, FeatureExtractor.URL_SHORTENERS))
+        ),
+    }
+    
+    features = pd.DataFrame(columns, index=urls.index).astype(np.float64)
+    
+    irregular = urls.str.contains(_IRREGULAR_URL_RE).to_numpy()
+    if irregular.any():
+        n_lexical = len(FeatureExtractor.LEXICAL_FEATURES)
+        features.loc[irregular] = _SINGLETON.extract_batch(urls[irregular])[:, :n_lexical]
+    return features
+
+
 # Convenience function for quick feature extraction
 def extract_features(url: str, enrichment_data: Optional[Dict] = None) -> Dict[str, float]:
     """
@@ -226,5 +498,8 @@ def extract_features(url: str, enrichment_data: Optional[Dict] = None) -> Dict[s
     Returns:
         Dictionary of features
     """
-    extractor = FeatureExtractor()
-    return extractor.extract_all(url, enrichment_data)
+    return _SINGLETON.extract_all(url, enrichment_data)
+
+
+# Shared extractor instance (the extractor holds no per-URL state)
+_SINGLETON = FeatureExtractor()
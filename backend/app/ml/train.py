@@ -14,14 +14,18 @@ from sklearn.metrics import (
 )
 from sklearn.preprocessing import StandardScaler
 import joblib
+from joblib import Parallel, delayed
 from pathlib import Path
 import logging
 import argparse
+import hashlib
+import os
 import sys
 import json
 from datetime import datetime
 
-from features import FeatureExtractor
+from compact_forest import CompactForest, NUMBA_AVAILABLE
+from features import FeatureExtractor, vectorized_lexical_features
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,14 +33,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# lz4 decompresses faster than the disk reads it saves; joblib.load
+# detects the compression on its own, but needs lz4 installed to read it
+# (a hard requirement of the backend for that reason)
+ARTIFACT_COMPRESSION = ('lz4', 3)
+
+# Try to import Treelite (compiles tree ensembles to a native library)
+try:
+    import treelite
+    import tl2cgen
+    TREELITE_AVAILABLE = True
+except ImportError:
+    TREELITE_AVAILABLE = False
+    logger.info("treelite/tl2cgen not found. Skipping model compilation.")
+
+
+# Splits at least this large are extracted in parallel, in chunks of
+# EXTRACTION_CHUNK_SIZE URLs (one worker process per core)
+PARALLEL_EXTRACTION_MIN_URLS = 50000
+EXTRACTION_CHUNK_SIZE = 20000
+
+
+def read_split(csv_path):
+    """
+    Read one dataset split, preferring its Parquet copy when present.
+    
+    Only url/label are read; for CSVs, fixed dtypes skip type inference.
+    """
+    parquet_path = csv_path.with_suffix('.parquet')
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path, columns=['url', 'label']).astype(
+            {'url': 'string', 'label': 'int8'}
+        )
+    return pd.read_csv(
+        csv_path,
+        usecols=['url', 'label'],
+        dtype={'url': 'string', 'label': 'int8'},
+        engine='c'
+    )
+
 
 def load_data(train_path, val_path, test_path):
     """Load train/val/test datasets."""
     logger.info("Loading datasets...")
     
-    train_df = pd.read_csv(train_path)
-    val_df = pd.read_csv(val_path)
-    test_df = pd.read_csv(test_path)
+    train_df = read_split(train_path)
+    val_df = read_split(val_path)
+    test_df = read_split(test_path)
     
     logger.info(f"  Train: {len(train_df)} samples")
     logger.info(f"  Val:   {len(val_df)} samples")
@@ -52,38 +95,131 @@ def extract_features_from_df(df, extractor):
     For MVP, we only use lexical features (no enrichment data).
     """
     logger.info("Extracting features...")
-    features_list = []
-    failed_count = 0
     
-    for idx, url in enumerate(df['url']):
+    # Extract only lexical features for MVP
+    # (enrichment features will be added in Phase 5)
+    # float32 is ample for counts and ratios, and it is the dtype the
+    # forest trains on internally, so no float64 copy is ever made
+    urls = df['url']
+    if len(urls) >= PARALLEL_EXTRACTION_MIN_URLS:
+        # The per-URL parts (entropy, query keys, keywords) hold the GIL,
+        # so chunks go to worker processes rather than threads
+        chunks = [
+            urls.iloc[start:start + EXTRACTION_CHUNK_SIZE]
+            for start in range(0, len(urls), EXTRACTION_CHUNK_SIZE)
+        ]
+        lexical_df = pd.concat(
+            Parallel(n_jobs=-1, backend='loky')(
+                delayed(vectorized_lexical_features)(chunk) for chunk in chunks
+            )
+        )
+    else:
+        lexical_df = vectorized_lexical_features(urls)
+    features_df = lexical_df.reindex(
+        columns=extractor.get_feature_names(), fill_value=0.0
+    ).fillna(0.0).astype(np.float32)
+    
+    logger.info(f"  Extracted {len(features_df.columns)} features")
+    logger.info(f"  Feature names: {features_df.columns.tolist()[:10]}... (showing first 10)")
+    
+    return features_df
+
+
+def load_or_extract_features(df, extractor, cache_dir, split):
+    """
+    Extract features for a split, reusing a parquet cache across runs.
+    
+    The cache file is keyed by the extractor version and the split's URLs,
+    so changed data or feature definitions miss the cache.
+    """
+    key_source = extractor.version + '|' + '|'.join(df['url'].astype(str))
+    key = hashlib.sha1(key_source.encode()).hexdigest()[:16]
+    cache_path = cache_dir / f"features_{split}_{key}.parquet"
+    
+    if cache_path.exists():
         try:
-            # Extract only lexical features for MVP
-            # (enrichment features will be added in Phase 5)
-            features = extractor.extract_all(url, enrichment_data=None)
-            features_list.append(features)
+            features_df = pd.read_parquet(cache_path)
+            logger.info(f"Loaded cached {split} features from {cache_path}")
+            return features_df
         except Exception as e:
-            logger.warning(f"Failed to extract features from {url}: {e}")
-            # Use default features (all zeros)
-            features_list.append({name: 0.0 for name in extractor.get_feature_names()})
-            failed_count += 1
+            logger.warning(f"Ignoring unreadable feature cache {cache_path}: {e}")
+    
+    features_df = extract_features_from_df(df, extractor)
     
-    if failed_count > 0:
-        logger.warning(f"Failed to extract features from {failed_count}/{len(df)} URLs")
+    try:
+        features_df.to_parquet(cache_path, compression='zstd', index=False)
+        logger.info(f"  Cached features to {cache_path}")
+    except Exception as e:
+        # pyarrow/fastparquet not installed, or the directory is read-only
+        logger.warning(f"  Could not cache features: {e}")
     
-    features_df = pd.DataFrame(features_list)
+    return features_df
+
+
+def warm_start_halving_search(X, y, param_distributions, min_resources=20,
+                              max_resources=200, factor=3, cv=3, random_state=42):
+    """
+    Successive-halving search over random forest parameters.
     
-    # Ensure all feature columns exist
-    for feature_name in extractor.get_feature_names():
-        if feature_name not in features_df.columns:
-            features_df[feature_name] = 0.0
+    Every sampled candidate starts with min_resources trees; after each
+    round the best 1/factor (by mean CV F1) survive and grow to factor
+    times as many trees, up to max_resources. Forests are warm-started,
+    so a surviving candidate only builds its new trees each round instead
+    of refitting the whole forest as HalvingRandomSearchCV does.
     
-    # Reorder columns to match feature names
-    features_df = features_df[extractor.get_feature_names()]
+    Returns:
+        (best_params, n_estimators) for the winning candidate
+    """
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import ParameterSampler, StratifiedKFold
+    
+    resources = [min_resources]
+    while resources[-1] * factor <= max_resources:
+        resources.append(resources[-1] * factor)
+    n_candidates = factor ** (len(resources) - 1)
+    
+    candidates = list(ParameterSampler(param_distributions, n_candidates, random_state=random_state))
+    folds = list(StratifiedKFold(cv, shuffle=True, random_state=random_state).split(X, y))
+    # One warm-startable forest per (candidate, fold); n_jobs=1 because
+    # the parallelism is across fits
+    forests = {
+        (c, f): RandomForestClassifier(
+            warm_start=True, random_state=random_state, n_jobs=1, **candidates[c]
+        )
+        for c in range(len(candidates)) for f in range(cv)
+    }
     
-    logger.info(f"  Extracted {len(features_df.columns)} features")
-    logger.info(f"  Feature names: {features_df.columns.tolist()[:10]}... (showing first 10)")
+    def grow_and_score(key, n_estimators):
+        forest = forests[key]
+        train_idx, val_idx = folds[key[1]]
+        forest.n_estimators = n_estimators
+        forest.fit(X[train_idx], y[train_idx])  # Only adds the new trees
+        return key, f1_score(y[val_idx], forest.predict(X[val_idx]))
+    
+    survivors = list(range(len(candidates)))
+    for n_estimators in resources:
+        # Tree building releases the GIL, so threads share the forests
+        # in place instead of pickling them to worker processes
+        results = Parallel(n_jobs=os.cpu_count(), prefer='threads')(
+            delayed(grow_and_score)((c, f), n_estimators)
+            for c in survivors for f in range(cv)
+        )
+        scores = {c: 0.0 for c in survivors}
+        for (c, _), score in results:
+            scores[c] += score / cv
+        
+        survivors = sorted(survivors, key=scores.get, reverse=True)
+        logger.info(
+            f"  {n_estimators} trees: {len(scores)} candidates, "
+            f"best F1 {scores[survivors[0]]:.3f}"
+        )
+        survivors = survivors[:max(1, len(survivors) // factor)]
+        
+        # Drop eliminated forests as soon as they are out
+        for key in [k for k in forests if k[0] not in survivors]:
+            del forests[key]
     
-    return features_df
+    return candidates[survivors[0]], resources[-1]
 
 
 def train_model(X_train, y_train, model_type='random_forest'):
@@ -99,33 +235,31 @@ def train_model(X_train, y_train, model_type='random_forest'):
         model.fit(X_train, y_train)
         
     elif model_type == 'random_forest':
-        from sklearn.model_selection import GridSearchCV
+        from scipy.stats import randint
         
-        # Define parameter grid
-        param_grid = {
-            'n_estimators': [100, 200],
+        # Define parameter distributions (n_estimators is the halving
+        # resource, so it is grown by the search rather than sampled)
+        param_distributions = {
             'max_depth': [15, 20, None],
-            'min_samples_split': [2, 5, 10],
-            'min_samples_leaf': [1, 2, 4],
+            'min_samples_split': randint(2, 11),
+            'min_samples_leaf': randint(1, 5),
             'class_weight': ['balanced', 'balanced_subsample']
         }
         
-        rf = RandomForestClassifier(random_state=42, n_jobs=-1)
-        
-        logger.info("Tuning hyperparameters with GridSearchCV...")
-        grid_search = GridSearchCV(
-            estimator=rf,
-            param_grid=param_grid,
-            cv=3,
-            n_jobs=-1,
-            verbose=1,
-            scoring='f1'
+        logger.info("Tuning hyperparameters with warm-started successive halving...")
+        best_params, n_estimators = warm_start_halving_search(
+            X_train, y_train, param_distributions
         )
         
-        grid_search.fit(X_train, y_train)
-        
-        logger.info(f"Best parameters: {grid_search.best_params_}")
-        model = grid_search.best_estimator_
+        logger.info(f"Best parameters: {best_params} (n_estimators={n_estimators})")
+        # The final refit runs alone, so it can use every core; the saved
+        # model scores single rows in the detector's sklearn fallback,
+        # where one thread avoids pool start-up per call
+        model = RandomForestClassifier(
+            n_estimators=n_estimators, random_state=42, n_jobs=-1, **best_params
+        )
+        model.fit(X_train, y_train)
+        model.set_params(n_jobs=1)
         
     else:
         raise ValueError(f"Unknown model type: {model_type}")
@@ -139,8 +273,10 @@ def evaluate_model(model, X, y, dataset_name='Test'):
     """Evaluate model performance."""
     logger.info(f"\nEvaluating on {dataset_name} set...")
     
-    y_pred = model.predict(X)
-    y_proba = model.predict_proba(X)[:, 1]  # Probability of phishing class
+    # One pass over the ensemble; labels are derived from the probabilities
+    probabilities = model.predict_proba(X)
+    y_proba = probabilities[:, 1]  # Probability of phishing class
+    y_pred = model.classes_[probabilities.argmax(axis=1)]
     
     # Calculate metrics
     precision, recall, f1, support = precision_recall_fscore_support(
@@ -196,18 +332,44 @@ def get_feature_importance(model, feature_names):
 
 
 def save_model_artifacts(model, scaler, feature_names, metrics, model_dir, model_version):
-    """Save model, scaler, and metadata."""
+    """Save model, scaler (if any), and metadata."""
     logger.info(f"\nSaving model artifacts to {model_dir}...")
     
     # Save model
     model_path = model_dir / f"model_{model_version}.pkl"
-    joblib.dump(model, model_path)
+    joblib.dump(model, model_path, compress=ARTIFACT_COMPRESSION, protocol=5)
     logger.info(f"  ✅ Model: {model_path}")
     
-    # Save scaler
+    # Compile tree ensembles to a shared library, so the backend can load
+    # it directly instead of compiling on first start
+    if TREELITE_AVAILABLE and hasattr(model, 'estimators_'):
+        lib_path = model_dir / f"model_{model_version}.so"
+        try:
+            tl_model = treelite.sklearn.import_model(model)
+            tl2cgen.export_lib(
+                tl_model,
+                toolchain='gcc',
+                libpath=str(lib_path),
+                params={'parallel_comp': 8}
+            )
+            logger.info(f"  ✅ Compiled model: {lib_path}")
+        except Exception as e:
+            logger.warning(f"  Model compilation failed (backend will use sklearn): {e}")
+    
+    # Flat-array copy of the forest for the backend's Numba predictor
+    if NUMBA_AVAILABLE and hasattr(model, 'estimators_'):
+        forest_path = model_dir / f"model_{model_version}.npz"
+        CompactForest.from_sklearn(model).save(forest_path)
+        logger.info(f"  ✅ Compact forest: {forest_path}")
+    
+    # Save scaler (removing a stale one, so the backend uses raw features)
     scaler_path = model_dir / f"scaler_{model_version}.pkl"
-    joblib.dump(scaler, scaler_path)
-    logger.info(f"  ✅ Scaler: {scaler_path}")
+    if scaler is not None:
+        joblib.dump(scaler, scaler_path, compress=ARTIFACT_COMPRESSION, protocol=5)
+        logger.info(f"  ✅ Scaler: {scaler_path}")
+    else:
+        scaler_path.unlink(missing_ok=True)
+        logger.info("  Scaler: none (model uses unscaled features)")
     
     # Save feature names
     features_path = model_dir / f"features_{model_version}.json"
@@ -258,7 +420,7 @@ def main():
     test_path = processed_dir / "test.csv"
     
     # Check if data exists
-    if not train_path.exists():
+    if not train_path.exists() and not train_path.with_suffix('.parquet').exists():
         logger.error(f"Training data not found at {train_path}")
         logger.error("Please run data collection first: python data/scripts/collect_data.py")
         sys.exit(1)
@@ -272,20 +434,28 @@ def main():
     
     # Extract features
     extractor = FeatureExtractor()
-    X_train = extract_features_from_df(train_df, extractor)
-    X_val = extract_features_from_df(val_df, extractor)
-    X_test = extract_features_from_df(test_df, extractor)
+    X_train = load_or_extract_features(train_df, extractor, processed_dir, 'train')
+    X_val = load_or_extract_features(val_df, extractor, processed_dir, 'val')
+    X_test = load_or_extract_features(test_df, extractor, processed_dir, 'test')
     
     y_train = train_df['label'].values
     y_val = val_df['label'].values
     y_test = test_df['label'].values
     
-    # Normalize features
-    logger.info("Normalizing features...")
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_val_scaled = scaler.transform(X_val)
-    X_test_scaled = scaler.transform(X_test)
+    # Normalize features (Random Forest is scale-invariant, so only the
+    # linear model gets a scaler)
+    if args.model_type == 'logistic_regression':
+        logger.info("Normalizing features...")
+        # copy=False scales the float32 matrices in place
+        scaler = StandardScaler(copy=False)
+        X_train_scaled = scaler.fit_transform(X_train.to_numpy())
+        X_val_scaled = scaler.transform(X_val.to_numpy())
+        X_test_scaled = scaler.transform(X_test.to_numpy())
+    else:
+        scaler = None
+        X_train_scaled = X_train.to_numpy()
+        X_val_scaled = X_val.to_numpy()
+        X_test_scaled = X_test.to_numpy()
     
     # Train model
     model = train_model(X_train_scaled, y_train, model_type=args.model_type)
@@ -1,29 +1,67 @@
 """
 SQLAlchemy database models.
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, SmallInteger, Float, Boolean, DateTime, Text, ForeignKey, JSON, Index, Uuid
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
+from enum import IntEnum
 import uuid
 
 from app.core.database import Base
 
 
+class Verdict(IntEnum):
+    """Stored integer codes for verdict strings."""
+    BENIGN = 0
+    SUSPICIOUS = 1
+    MALICIOUS = 2
+    PENDING = 3
+    FAILED = 4
+    UNKNOWN = 5
+
+
+class VerdictType(TypeDecorator):
+    """Verdict strings in Python, SMALLINT codes in the database."""
+    impl = SmallInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        member = Verdict.__members__.get(str(value).upper())
+        # Unknown strings bind as NULL, so filters on them match nothing
+        return int(member) if member is not None else None
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # int(): migrated SQLite columns keep TEXT affinity and return '2'
+        return Verdict(int(value)).name.lower()
+
+
 class URLCheck(Base):
     """Main table for URL check requests and results."""
     __tablename__ = "url_checks"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Native UUID on Postgres (16 bytes), CHAR(32) hex elsewhere
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     submitted_url = Column(Text, nullable=False)
-    normalized_url = Column(Text, nullable=False, index=True)
+    normalized_url = Column(Text, nullable=False)
+    domain = Column(String(255), nullable=True, index=True)  # netloc of normalized_url
     submitter_id = Column(String(255), nullable=True)
     ip_address = Column(String(45), nullable=True)
     
     # Result
-    verdict = Column(String(20), nullable=False, index=True)  # benign, suspicious, malicious
+    verdict = Column(VerdictType, nullable=False)  # benign, suspicious, malicious
     confidence = Column(Float, nullable=False)
     model_version = Column(String(50), nullable=False)
     
+    # Explanation (persisted at submit time so reads never re-run the model)
+    top_features = Column(JSON, nullable=True)
+    all_features = Column(JSON, nullable=True)
+    additional_info = Column(JSON, nullable=True)
+    
     # Performance
     processing_time_ms = Column(Integer, nullable=True)
     
@@ -33,14 +71,24 @@ class URLCheck(Base):
     
     # Relationships
     enrichments = relationship("Enrichment", back_populates="url_check", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Search filters on verdict and orders by created_at: equality column
+        # first so the index serves both the filter and the sort
+        # (it also covers verdict-only filters, so verdict has no index of its own)
+        Index("ix_url_checks_verdict_created_at", "verdict", "created_at"),
+        # URL lookups are equality-only: a hash index on Postgres (no B-tree
+        # key size limit for long URLs); other dialects get a plain index
+        Index("ix_url_checks_normalized_url", "normalized_url", postgresql_using="hash"),
+    )
 
 
 class Enrichment(Base):
     """Enrichment data from external sources."""
     __tablename__ = "enrichments"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    url_check_id = Column(String(36), ForeignKey("url_checks.id"), nullable=False, index=True)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    url_check_id = Column(Uuid, ForeignKey("url_checks.id"), nullable=False)
     
     source = Column(String(50), nullable=False)  # whois, dns, gsb, virustotal, etc.
     raw_response = Column(JSON, nullable=True)
@@ -53,6 +101,11 @@ class Enrichment(Base):
     
     # Relationships
     url_check = relationship("URLCheck", back_populates="enrichments")
+    
+    __table_args__ = (
+        # Per-check lookups, optionally narrowed to one source
+        Index("ix_enrichments_url_check_id_source", "url_check_id", "source"),
+    )
 
 
 class ThreatIntelCache(Base):
@@ -1,41 +1,63 @@
 """
 Pydantic schemas for request/response validation.
 """
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 from uuid import UUID
 
 
+# Request bodies are immutable, reject unknown fields and strip strings;
+# responses are immutable and can be built from ORM objects (the empty
+# protected_namespaces allows the model_version field)
+REQUEST_CONFIG = ConfigDict(frozen=True, extra='forbid', str_strip_whitespace=True)
+RESPONSE_CONFIG = ConfigDict(frozen=True, from_attributes=True, protected_namespaces=())
+
+
 # Request schemas
 class URLCheckRequest(BaseModel):
+    model_config = REQUEST_CONFIG
+    
     url: str = Field(..., description="URL to check for phishing")
     metadata: Optional[Dict] = Field(default=None, description="Optional metadata")
 
 
-# Response schemas
-class URLCheckResponse(BaseModel):
-    check_id: UUID
-    status: str  # processing, complete, failed
-    estimated_time_seconds: Optional[int] = None
+class URLCheckBatchRequest(BaseModel):
+    model_config = REQUEST_CONFIG
+    
+    urls: List[str] = Field(..., min_length=1, max_length=100, description="URLs to check")
+
+
+class URLCheckStreamRequest(URLCheckRequest):
+    ref: Optional[Any] = Field(default=None, description="Client tag echoed back with the result")
+
+
+class BatchPredictRequest(BaseModel):
+    model_config = REQUEST_CONFIG
     
-    class Config:
-        from_attributes = True
+    urls: List[str] = Field(..., min_length=1, max_length=100, description="URLs to score")
 
 
+# Response schemas
 class FeatureContribution(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     name: str
     value: float
     contribution: float
 
 
 class EnrichmentSummary(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     source: str
     success: bool
     key_fields: Optional[Dict] = None
 
 
 class URLCheckResult(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     check_id: UUID
     url: str
     verdict: str  # benign, suspicious, malicious
@@ -48,9 +70,46 @@ class URLCheckResult(BaseModel):
     
     processing_time_ms: Optional[int] = None
     timestamp: datetime
+
+
+class URLCheckResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
     
-    class Config:
-        from_attributes = True
+    check_id: UUID
+    status: str  # processing, complete, failed
+    estimated_time_seconds: Optional[int] = None
+    result: Optional[URLCheckResult] = None  # set for ?wait=true once scored
+
+
+class URLCheckBatchResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
+    results: List[URLCheckResult]
+
+
+class URLCheckStreamResult(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
+    ref: Optional[Any] = None
+    result: Optional[URLCheckResult] = None
+    error: Optional[str] = None
+
+
+class BatchPredictItem(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
+    url: str
+    verdict: str
+    confidence: float
+    model_version: str
+    top_features: List[FeatureContribution]
+
+
+class BatchPredictResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
+    results: List[BatchPredictItem]
+    processing_time_ms: Optional[int] = None
 
 
 class URLCheckDetail(URLCheckResult):
@@ -60,22 +119,38 @@ class URLCheckDetail(URLCheckResult):
 
 
 # Search schemas
+class SearchCursor(BaseModel):
+    """Position after the last row of a page: (created_at, id) of that row."""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+    
+    created_at: datetime
+    id: UUID
+
+
 class SearchParams(BaseModel):
+    model_config = REQUEST_CONFIG
+    
     domain: Optional[str] = None
     verdict: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     limit: int = Field(default=50, le=100)
-    offset: int = Field(default=0, ge=0)
+    offset: int = Field(default=0, ge=0, description="Ignored when cursor is set")
+    cursor: Optional[SearchCursor] = Field(default=None, description="next_cursor from the previous page")
 
 
 class SearchResult(BaseModel):
-    total: int
+    model_config = RESPONSE_CONFIG
+    
+    total: Optional[int] = None  # Only computed for the first page
     results: List[URLCheckResult]
+    next_cursor: Optional[SearchCursor] = None
 
 
 # Stats schemas
 class StatsResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     total_checks: int
     verdict_distribution: Dict[str, int]
     top_domains: List[Dict[str, Any]]
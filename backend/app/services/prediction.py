@@ -0,0 +1,16 @@
+"""
+ML prediction service shared by the API and background workers.
+"""
+from typing import Dict
+
+from app.models import URLCheck
+
+
+def apply_prediction(url_check: URLCheck, prediction: Dict) -> None:
+    """Copy a detector prediction onto a URLCheck row."""
+    url_check.verdict = prediction["verdict"]
+    url_check.confidence = prediction["confidence"]
+    url_check.model_version = prediction["model_version"]
+    url_check.top_features = prediction["top_features"]
+    url_check.all_features = prediction["all_features"]
+    url_check.additional_info = prediction.get("additional_info")
@@ -0,0 +1,19 @@
+"""
+Celery application for background URL scoring.
+"""
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "phishing_detector",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.scoring"]
+)
+
+# Model inference is CPU-bound; keep it on its own queue so it can be
+# scaled independently of any future I/O-bound tasks
+celery_app.conf.task_routes = {
+    "app.tasks.scoring.*": {"queue": "cpu"}
+}
@@ -0,0 +1,59 @@
+"""
+Background scoring tasks.
+"""
+import asyncio
+import time
+import logging
+from uuid import UUID
+
+from app.core.database import SessionLocal
+from app.models import URLCheck
+from app.ml.model import get_detector
+from app.services.prediction import apply_prediction
+from app.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+# One event loop per worker process, created after fork, so the detector's
+# pooled async HTTP client stays bound to a live loop across tasks
+_loop = None
+
+
+def _run(coro):
+    """Run a coroutine on this worker's event loop."""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task(name="app.tasks.scoring.score_url")
+def score_url(check_id: str, url: str, use_cache: bool = True) -> None:
+    """Run the detector for a pending check and store the result."""
+    # Task arguments are JSON, so the id arrives as a string
+    check_uuid = UUID(check_id)
+    db = SessionLocal()
+    try:
+        url_check = db.query(URLCheck).filter(URLCheck.id == check_uuid).first()
+        if not url_check:
+            logger.warning("Check %s not found, skipping scoring", check_id)
+            return
+        
+        start_time = time.time()
+        prediction = _run(get_detector().predict(url, enrichment_data=None, use_cache=use_cache))
+        
+        apply_prediction(url_check, prediction)
+        url_check.processing_time_ms = int((time.time() - start_time) * 1000)
+        db.commit()
+        
+        logger.info("URL check complete: %s - %s (%.2f)", check_id, prediction['verdict'], prediction['confidence'])
+        
+    except Exception as e:
+        logger.error("Scoring failed for %s: %s", check_id, e)
+        db.rollback()
+        url_check = db.query(URLCheck).filter(URLCheck.id == check_uuid).first()
+        if url_check:
+            url_check.verdict = "failed"
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+One-shot migration: bring an existing database up to the current
+url_checks/enrichments schema.
+
+create_all() only creates missing tables, so databases created before
+these columns and key types existed need this once:
+    - adds url_checks.domain (backfilled from normalized_url) and the
+      top_features / all_features / additional_info JSON columns
+    - converts String(36) ids to the Uuid type (native UUID on Postgres,
+      32-char hex on SQLite)
+    - replaces the old single-column indexes with the current ones
+    - converts text verdicts to SMALLINT codes (scripts.migrate_verdicts)
+
+Safe to re-run. Run from the backend directory:
+    python -m scripts.migrate_schema
+"""
+import logging
+from urllib.parse import urlparse
+
+from sqlalchemy import inspect, text, Integer
+
+from app.core.database import engine
+from app.models import URLCheck, Enrichment
+from scripts import migrate_verdicts
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# url_checks columns added after the initial schema
+NEW_URL_CHECK_COLUMNS = ("domain", "top_features", "all_features", "additional_info")
+
+# Indexes from the initial schema that the current models no longer define
+# (ix_url_checks_normalized_url is recreated: it is a hash index on Postgres now)
+OBSOLETE_INDEXES = {
+    "url_checks": ("ix_url_checks_verdict", "ix_url_checks_normalized_url"),
+    "enrichments": ("ix_enrichments_url_check_id",),
+}
+
+# Rows per UPDATE batch when backfilling domain
+BACKFILL_BATCH_SIZE = 1000
+
+
+def add_columns(conn, inspector):
+    """Add any url_checks columns the table is missing."""
+    existing = {c["name"] for c in inspector.get_columns("url_checks")}
+    for name in NEW_URL_CHECK_COLUMNS:
+        if name in existing:
+            continue
+        column_type = URLCheck.__table__.c[name].type.compile(dialect=engine.dialect)
+        conn.execute(text(f"ALTER TABLE url_checks ADD COLUMN {name} {column_type}"))
+        logger.info("Added url_checks.%s", name)
+
+
+def backfill_domains(conn):
+    """Fill url_checks.domain from normalized_url where it is NULL."""
+    rows = conn.execute(text(
+        "SELECT id, normalized_url FROM url_checks WHERE domain IS NULL"
+    )).fetchall()
+    
+    update = text("UPDATE url_checks SET domain = :domain WHERE id = :id")
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        batch = rows[start:start + BACKFILL_BATCH_SIZE]
+        conn.execute(update, [{"id": row.id, "domain": urlparse(row.normalized_url).netloc} for row in batch])
+    
+    logger.info("Backfilled domain for %d rows", len(rows))
+
+
+def convert_ids(conn, inspector):
+    """Move String(36) ids to the storage the Uuid column type expects."""
+    if engine.dialect.name == "postgresql":
+        id_type = {c["name"]: c["type"] for c in inspector.get_columns("url_checks")}["id"]
+        if id_type.__class__.__name__.upper() == "UUID":
+            return
+        
+        # The foreign key has to go while both sides change type
+        foreign_keys = inspector.get_foreign_keys("enrichments")
+        for fk in foreign_keys:
+            conn.execute(text(f'ALTER TABLE enrichments DROP CONSTRAINT "{fk["name"]}"'))
+        
+        conn.execute(text("ALTER TABLE url_checks ALTER COLUMN id TYPE UUID USING id::uuid"))
+        conn.execute(text("ALTER TABLE enrichments ALTER COLUMN id TYPE UUID USING id::uuid"))
+        conn.execute(text(
+            "ALTER TABLE enrichments ALTER COLUMN url_check_id TYPE UUID USING url_check_id::uuid"
+        ))
+        
+        for fk in foreign_keys:
+            conn.execute(text(
+                f'ALTER TABLE enrichments ADD CONSTRAINT "{fk["name"]}" '
+                "FOREIGN KEY (url_check_id) REFERENCES url_checks (id)"
+            ))
+    else:
+        # Uuid is stored as 32 hex characters without hyphens
+        for table, column in (("url_checks", "id"), ("enrichments", "id"), ("enrichments", "url_check_id")):
+            result = conn.execute(text(
+                f"UPDATE {table} SET {column} = replace({column}, '-', '') WHERE {column} LIKE '%-%'"
+            ))
+            logger.info("Converted %d %s.%s values", result.rowcount, table, column)
+    
+    logger.info("Ids converted to Uuid storage")
+
+
+def rebuild_indexes(conn, inspector):
+    """Drop indexes from the initial schema and create the current ones."""
+    for table, names in OBSOLETE_INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        for name in names:
+            if name in existing:
+                conn.execute(text(f"DROP INDEX {name}"))
+                logger.info("Dropped index %s", name)
+    
+    for index in (*URLCheck.__table__.indexes, *Enrichment.__table__.indexes):
+        index.create(conn, checkfirst=True)
+
+
+def verdicts_are_text(inspector):
+    """True while url_checks.verdict still holds verdict strings."""
+    verdict_type = {c["name"]: c["type"] for c in inspector.get_columns("url_checks")}["verdict"]
+    return not isinstance(verdict_type, Integer)
+
+
+def main():
+    """Upgrade url_checks and enrichments in place."""
+    inspector = inspect(engine)
+    if not inspector.has_table("url_checks"):
+        logger.info("No url_checks table; create_all will build the current schema")
+        return
+    
+    convert_verdicts = verdicts_are_text(inspector)
+    
+    with engine.begin() as conn:
+        add_columns(conn, inspector)
+        backfill_domains(conn)
+        convert_ids(conn, inspector)
+        rebuild_indexes(conn, inspector)
+    
+    if convert_verdicts:
+        migrate_verdicts.main()
+    
+    logger.info("✅ Schema migration complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+One-shot migration: convert url_checks.verdict from text to SMALLINT codes.
+
+Run once from the backend directory against an existing database:
+    python -m scripts.migrate_verdicts
+(scripts.migrate_schema runs this as its last step.)
+"""
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.models import Verdict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# CASE expression mapping verdict strings to their integer codes
+VERDICT_CASE = "CASE verdict " + " ".join(
+    f"WHEN '{v.name.lower()}' THEN {v.value}" for v in Verdict
+) + f" ELSE {Verdict.UNKNOWN.value} END"
+
+
+def main():
+    """Rewrite stored verdicts as integer codes."""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                f"ALTER TABLE url_checks ALTER COLUMN verdict TYPE SMALLINT USING ({VERDICT_CASE})"
+            ))
+        else:
+            # SQLite columns are dynamically typed: rewriting the values is
+            # enough. The old VARCHAR column has TEXT affinity, so codes are
+            # stored back as text ('2'); only non-numeric values are converted
+            result = conn.execute(text(
+                f"UPDATE url_checks SET verdict = {VERDICT_CASE} "
+                "WHERE typeof(verdict) = 'text' AND verdict GLOB '*[^0-9]*'"
+            ))
+            logger.info("Converted %d rows", result.rowcount)
+    
+    logger.info("✅ Verdict migration complete")
+
+
+if __name__ == "__main__":
+    main()
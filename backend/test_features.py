@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from app.ml.features import FeatureExtractor, vectorized_lexical_features
+
+# Run from the backend directory: python -m pytest test_features.py
+
+URLS = [
+    "https://www.google.com/search?q=phishing+test",
+    "http://paypal-secure-login.com/verify?id=1&token=abc&token=def",
+    "http://192.168.0.1/admin/login.php",
+    "https://bit.ly/3xYzAbC",
+    "github.com/htrap1211/url-phishing-detector",
+    "",
+    # urlparse() normalises these before splitting
+    "  https://www.google.com/",
+    "https://www.google.com/  ",
+    "\thttp://paypal-secure-login.com/verify",
+    "http://paypal-\tsecure-login.com/ver\nify?a=1\r",
+    "\x00http://example.com/a/b",
+    "http://example.com/a/;params",
+    "http://[::1]/login",
+    "http://[not-an-ip/login",
+]
+
+
+def test_vectorized_features_match_extract_batch():
+    extractor = FeatureExtractor()
+    n_lexical = len(FeatureExtractor.LEXICAL_FEATURES)
+    expected = extractor.extract_batch(URLS)[:, :n_lexical]
+    actual = vectorized_lexical_features(pd.Series(URLS)).to_numpy()
+    
+    for url, expected_row, actual_row in zip(URLS, expected, actual):
+        assert np.allclose(actual_row, expected_row, rtol=1e-5, atol=1e-5), (
+            f"{url!r}: {dict(zip(FeatureExtractor.LEXICAL_FEATURES, zip(expected_row, actual_row)))}"
+        )
+
+
+if __name__ == "__main__":
+    test_vectorized_features_match_extract_batch()
+    print("✅ Vectorized lexical features match extract_batch")
@@ -5,13 +5,15 @@ Collect and prepare training data for URL phishing detection.
 This script downloads phishing URLs from PhishTank and benign URLs from Tranco,
 then combines and splits them into train/validation/test sets.
 """
+import numpy as np
 import pandas as pd
 import requests
+from sklearn.model_selection import train_test_split
 from pathlib import Path
 import logging
 import argparse
+import shutil
 import sys
-from io import StringIO
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +21,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Arrow-backed strings make column-wide concatenation a native kernel
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 DATA_DIR = SCRIPT_DIR.parent
@@ -26,6 +35,15 @@ RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
 
+def download_to_file(url, dest):
+    """Stream a download straight to disk without holding the body in memory."""
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True  # Undo gzip/deflate transfer encoding
+        with open(dest, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+
+
 def download_phishing_urls(count=2500):
     """
     Download phishing URLs from PhishTank.
@@ -42,29 +60,24 @@ def download_phishing_urls(count=2500):
     url = "http://data.phishtank.com/data/online-valid.csv"
     
     try:
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        
         # Save raw data
         raw_file = RAW_DIR / "phishtank_raw.csv"
-        raw_file.write_text(response.text)
+        download_to_file(url, raw_file)
         logger.info(f"Saved raw PhishTank data to {raw_file}")
         
-        # Parse CSV
-        df = pd.read_csv(StringIO(response.text))
-        
         # PhishTank CSV has columns: phish_id, url, phish_detail_url, submission_time, verified, verification_time, online, target
-        if 'url' not in df.columns:
-            logger.error(f"Unexpected PhishTank format. Columns: {df.columns.tolist()}")
+        columns = pd.read_csv(raw_file, nrows=0).columns
+        if 'url' not in columns:
+            logger.error(f"Unexpected PhishTank format. Columns: {columns.tolist()}")
             return pd.DataFrame()
         
-        # Sample requested count
-        df = df.head(count)
+        # Parse only the url column of the requested count of rows
+        df = pd.read_csv(raw_file, usecols=['url'], nrows=count)
         
         # Create standardized format
         result_df = pd.DataFrame({
             'url': df['url'],
-            'label': 1,  # 1 = phishing
+            'label': np.int8(1),  # 1 = phishing
             'source': 'phishtank'
         })
         
@@ -94,24 +107,22 @@ def download_benign_urls(count=2500):
         # First, get the latest list ID
         list_url = "https://tranco-list.eu/top-1m.csv.zip"
         
-        response = requests.get(list_url, timeout=60)
-        response.raise_for_status()
-        
         # Save zip file
         zip_file = RAW_DIR / "tranco.csv.zip"
-        zip_file.write_bytes(response.content)
+        download_to_file(list_url, zip_file)
         logger.info(f"Saved Tranco data to {zip_file}")
         
-        # Read CSV from zip (Tranco format: rank,domain)
-        df = pd.read_csv(zip_file, names=['rank', 'domain'], header=None)
-        
-        # Sample requested count
-        df = df.head(count)
+        # Read CSV from zip (Tranco format: rank,domain), stopping after
+        # the requested count of rows
+        df = pd.read_csv(
+            zip_file, names=['rank', 'domain'], header=None,
+            usecols=['domain'], nrows=count, dtype={'domain': STRING_DTYPE}
+        )
         
         # Convert domains to HTTPS URLs
         result_df = pd.DataFrame({
             'url': 'https://' + df['domain'],
-            'label': 0,  # 0 = benign
+            'label': np.int8(0),  # 0 = benign
             'source': 'tranco'
         })
         
@@ -144,18 +155,16 @@ def combine_and_split(phishing_df, benign_df, train_ratio=0.7, val_ratio=0.15, t
     df = pd.concat([phishing_df, benign_df], ignore_index=True)
     logger.info(f"Combined dataset: {len(df)} URLs ({len(phishing_df)} phishing, {len(benign_df)} benign)")
     
-    # Shuffle with fixed seed for reproducibility
-    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    
-    # Calculate split indices
-    n = len(df)
-    train_end = int(train_ratio * n)
-    val_end = int((train_ratio + val_ratio) * n)
-    
-    # Split
-    train_df = df[:train_end]
-    val_df = df[train_end:val_end]
-    test_df = df[val_end:]
+    # Stratified split with fixed seed for reproducibility: every split
+    # keeps the combined phishing/benign ratio
+    holdout_ratio = val_ratio + test_ratio
+    train_df, holdout_df = train_test_split(
+        df, test_size=holdout_ratio, stratify=df['label'], random_state=42
+    )
+    val_df, test_df = train_test_split(
+        holdout_df, test_size=test_ratio / holdout_ratio,
+        stratify=holdout_df['label'], random_state=42
+    )
     
     # Verify class balance
     logger.info(f"\nDataset Statistics:")
@@ -177,6 +186,15 @@ def combine_and_split(phishing_df, benign_df, train_ratio=0.7, val_ratio=0.15, t
     logger.info(f"  Val:   {val_path}")
     logger.info(f"  Test:  {test_path}")
     
+    # Parquet copies for training (typed and columnar, much faster to
+    # load); the CSVs are kept for inspection
+    try:
+        for split_df, csv_path in [(train_df, train_path), (val_df, val_path), (test_df, test_path)]:
+            split_df.to_parquet(csv_path.with_suffix('.parquet'), compression='zstd', index=False)
+        logger.info("  Parquet copies saved next to the CSVs")
+    except Exception as e:
+        logger.warning(f"Could not write Parquet copies (train.py will read the CSVs): {e}")
+    
     return train_df, val_df, test_df
 
 
@@ -196,19 +214,22 @@ def main():
     if args.skip_download:
         logger.info("Skipping download, loading from raw files...")
         try:
-            phishing_df = pd.read_csv(RAW_DIR / "phishtank_raw.csv")
-            phishing_df = phishing_df.head(args.phishing_count)
+            phishing_df = pd.read_csv(
+                RAW_DIR / "phishtank_raw.csv", usecols=['url'], nrows=args.phishing_count
+            )
             phishing_df = pd.DataFrame({
                 'url': phishing_df['url'],
-                'label': 1,
+                'label': np.int8(1),
                 'source': 'phishtank'
             })
             
-            benign_df = pd.read_csv(RAW_DIR / "tranco.csv.zip", names=['rank', 'domain'], header=None)
-            benign_df = benign_df.head(args.benign_count)
+            benign_df = pd.read_csv(
+                RAW_DIR / "tranco.csv.zip", names=['rank', 'domain'], header=None,
+                usecols=['domain'], nrows=args.benign_count, dtype={'domain': STRING_DTYPE}
+            )
             benign_df = pd.DataFrame({
                 'url': 'https://' + benign_df['domain'],
-                'label': 0,
+                'label': np.int8(0),
                 'source': 'tranco'
             })
         except Exception as e:
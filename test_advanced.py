@@ -1,7 +1,25 @@
-import requests
-import json
+import asyncio
+import os
+
+import httpx
+import orjson
+
+# IP literal rather than localhost: no resolver (or IPv6 fallback) lookup per request
+BASE_URL = "http://127.0.0.1:8000"
+CHECK_PATH = "/api/v1/url/check"
+POLL_ATTEMPTS = 20
+POLL_INTERVAL_SECONDS = 0.5
+
+# Set API_HTTP2=1 when the API runs on an HTTP/2-capable server (e.g.
+# hypercorn): all requests then multiplex over one connection using h2
+# prior knowledge. uvicorn only speaks HTTP/1.1, so it stays the default.
+USE_HTTP2 = os.environ.get("API_HTTP2") == "1"
+
+
+def _json(response):
+    """Decode a JSON response body with orjson."""
+    return orjson.loads(response.content)
 
-API_URL = "http://localhost:8000/api/v1/url/check"
 
 def test_advanced_features():
     tests = [
@@ -34,42 +52,59 @@ def test_advanced_features():
     print("🧪 Testing Advanced Features...")
     print("=" * 50)
     
-    for test in tests:
-        print(f"Testing: {test['name']}")
-        print(f"URL: {test['url']}")
-        try:
-            response = requests.post(API_URL, json={"url": test['url']})
-            if response.status_code == 200:
-                data = response.json()
-                check_id = data["check_id"]
-                
-                # Get result
-                result_response = requests.get(f"http://localhost:8000/api/v1/url/{check_id}")
-                result = result_response.json()
-                
-                print(f"Verdict: {result['verdict']}")
-                print(f"Confidence: {result['confidence']}")
-                
-                # Check features
-                top_features = [f['name'] for f in result['top_features']]
-                print(f"Top Features: {top_features}")
-                
-                if test['expected_feature']:
-                    if any(test['expected_feature'] in f for f in top_features):
-                        print("✅ Feature detected")
-                    else:
-                        print(f"❌ Feature NOT detected (Expected {test['expected_feature']})")
-                
-                if result['verdict'] == test['expected_verdict']:
-                    print("✅ Verdict matches")
+    # All cases run concurrently over one pooled client; output is
+    # printed afterwards in test order
+    for lines in asyncio.run(run_tests(tests)):
+        for line in lines:
+            print(line)
+        print("-" * 50)
+
+
+async def run_tests(tests):
+    transport = httpx.AsyncHTTPTransport(http1=not USE_HTTP2, http2=USE_HTTP2)
+    async with httpx.AsyncClient(base_url=BASE_URL, transport=transport, timeout=30.0) as client:
+        return await asyncio.gather(*(check_one(client, test) for test in tests))
+
+
+async def check_one(client, test):
+    lines = [f"Testing: {test['name']}", f"URL: {test['url']}"]
+    try:
+        response = await client.post(CHECK_PATH, json={"url": test['url']})
+        if response.status_code == 200:
+            data = _json(response)
+            check_id = data["check_id"]
+            
+            # Get result (polling while a worker is still scoring it)
+            for _ in range(POLL_ATTEMPTS):
+                result_response = await client.get(f"/api/v1/url/{check_id}")
+                result = _json(result_response)
+                if result['verdict'] != "pending":
+                    break
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            
+            lines.append(f"Verdict: {result['verdict']}")
+            lines.append(f"Confidence: {result['confidence']}")
+            
+            # Check features
+            top_features = [f['name'] for f in result['top_features']]
+            lines.append(f"Top Features: {top_features}")
+            
+            if test['expected_feature']:
+                if any(test['expected_feature'] in f for f in top_features):
+                    lines.append("✅ Feature detected")
                 else:
-                    print(f"❌ Verdict mismatch (Expected {test['expected_verdict']})")
-                    
+                    lines.append(f"❌ Feature NOT detected (Expected {test['expected_feature']})")
+            
+            if result['verdict'] == test['expected_verdict']:
+                lines.append("✅ Verdict matches")
             else:
-                print(f"Error: {response.status_code}")
-        except Exception as e:
-            print(f"Failed: {e}")
-        print("-" * 50)
+                lines.append(f"❌ Verdict mismatch (Expected {test['expected_verdict']})")
+                
+        else:
+            lines.append(f"Error: {response.status_code}")
+    except Exception as e:
+        lines.append(f"Failed: {e}")
+    return lines
 
 if __name__ == "__main__":
     test_advanced_features()
@@ -3,90 +3,133 @@
 Test script for URL Phishing Detection API.
 """
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import argparse
+import orjson
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-API_BASE = "http://localhost:8000"
+# IP literal rather than localhost: no resolver (or IPv6 fallback) lookup per request
+API_BASE = "http://127.0.0.1:8000"
+
+# One keep-alive session for every call (no new TCP connection per request);
+# transient connection errors and gateway/unavailable responses are retried
+RETRY = Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=RETRY))
+
+# Bodies are encoded/decoded with orjson rather than requests' stdlib json
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+BENIGN_URLS = (
+    "https://google.com",
+    "https://github.com",
+)
+SUSPICIOUS_URLS = (
+    "http://paypal-secure-login-verify-account.com/update",
+    "http://192.168.1.1/login.php?redirect=secure",
+)
+
+
+def _json(response):
+    """Decode a JSON response body with orjson."""
+    return orjson.loads(response.content)
 
 
 def test_health():
     """Test health endpoint."""
     print("Testing /health endpoint...")
-    response = requests.get(f"{API_BASE}/health")
+    response = SESSION.get(f"{API_BASE}/health")
     print(f"  Status: {response.status_code}")
-    print(f"  Response: {json.dumps(response.json(), indent=2)}")
+    print(f"  Response: {orjson.dumps(_json(response), option=orjson.OPT_INDENT_2).decode()}")
     print()
 
 
 def test_url_check(url):
-    """Test URL check endpoint."""
-    print(f"Testing URL: {url}")
+    """Test URL check endpoint; returns the report lines for url."""
+    lines = [f"Testing URL: {url}"]
     
     # Submit URL
-    response = requests.post(
+    response = SESSION.post(
         f"{API_BASE}/api/v1/url/check",
-        json={"url": url}
+        params={"wait": "true"},
+        data=orjson.dumps({"url": url}),
+        headers=JSON_HEADERS
     )
     
-    print(f"  Submit Status: {response.status_code}")
-    result = response.json()
-    print(f"  Check ID: {result['check_id']}")
-    print(f"  Status: {result['status']}")
-    print()
-    
-    # Get result
-    check_id = result['check_id']
-    response = requests.get(f"{API_BASE}/api/v1/url/{check_id}")
+    lines.append(f"  Submit Status: {response.status_code}")
+    result = _json(response)
+    lines.append(f"  Check ID: {result['check_id']}")
+    lines.append(f"  Status: {result['status']}")
+    lines.append("")
     
-    print(f"  Result Status: {response.status_code}")
-    result = response.json()
-    print(f"  Verdict: {result['verdict']}")
-    print(f"  Confidence: {result['confidence']:.2%}")
-    print(f"  Top Features:")
+    # Scored inline with ?wait=true; poll only if it was queued
+    if result.get('result') is not None:
+        result = result['result']
+    else:
+        check_id = result['check_id']
+        response = SESSION.get(f"{API_BASE}/api/v1/url/{check_id}")
+        lines.append(f"  Result Status: {response.status_code}")
+        result = _json(response)
+    lines.append(f"  Verdict: {result['verdict']}")
+    lines.append(f"  Confidence: {result['confidence']:.2%}")
+    lines.append(f"  Top Features:")
     for feature in result['top_features'][:3]:
-        print(f"    - {feature['name']}: {feature['value']:.2f} (importance: {feature['contribution']:.3f})")
-    print()
+        lines.append(f"    - {feature['name']}: {feature['value']:.2f} (importance: {feature['contribution']:.3f})")
+    lines.append("")
+    return lines
 
 
 def test_stats():
     """Test stats endpoint."""
     print("Testing /stats endpoint...")
-    response = requests.get(f"{API_BASE}/api/v1/url/stats")
+    response = SESSION.get(f"{API_BASE}/api/v1/url/stats")
     print(f"  Status: {response.status_code}")
-    result = response.json()
+    result = _json(response)
     print(f"  Total Checks: {result['total_checks']}")
     print(f"  Verdict Distribution: {result['verdict_distribution']}")
     print()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Smoke-test the URL Phishing Detection API")
+    parser.add_argument("--skip-health", action="store_true", help="Skip the /health check")
+    parser.add_argument("--no-stats", action="store_true", help="Skip the /stats aggregation")
+    args = parser.parse_args()
+    
     print("="*60)
     print("URL Phishing Detection API - Test Script")
     print("="*60)
     print()
     
-    # Test health
-    try:
-        test_health()
-    except Exception as e:
-        print(f"❌ Health check failed: {e}")
-        print("Make sure the backend is running: ./run_backend.sh")
-        return
+    # Test health (every run, unless explicitly skipped)
+    if args.skip_health:
+        print("Skipping /health endpoint (--skip-health)\n")
+    else:
+        try:
+            test_health()
+        except Exception as e:
+            print(f"❌ Health check failed: {e}")
+            print("Make sure the backend is running: ./run_backend.sh")
+            return
     
-    # Test benign URLs
-    print("Testing Benign URLs:")
-    print("-" * 60)
-    test_url_check("https://google.com")
-    test_url_check("https://github.com")
+    # Check every URL concurrently, then print the reports in order
+    with ThreadPoolExecutor(max_workers=len(BENIGN_URLS) + len(SUSPICIOUS_URLS)) as executor:
+        reports = list(executor.map(test_url_check, BENIGN_URLS + SUSPICIOUS_URLS))
     
-    # Test suspicious URLs
-    print("Testing Suspicious URLs:")
-    print("-" * 60)
-    test_url_check("http://paypal-secure-login-verify-account.com/update")
-    test_url_check("http://192.168.1.1/login.php?redirect=secure")
+    for title, report_group in (
+        ("Testing Benign URLs:", reports[:len(BENIGN_URLS)]),
+        ("Testing Suspicious URLs:", reports[len(BENIGN_URLS):])
+    ):
+        print(title)
+        print("-" * 60)
+        for lines in report_group:
+            print("\n".join(lines))
     
     # Test stats
-    test_stats()
+    if not args.no_stats:
+        test_stats()
     
     print("="*60)
     print("✅ All tests complete!")
@@ -94,4 +137,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with SESSION:
+        main()
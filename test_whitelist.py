@@ -1,7 +1,26 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+
+# IP literal rather than localhost: no resolver (or IPv6 fallback) lookup per request
+API_BASE = "http://127.0.0.1:8000"
+API_URL = f"{API_BASE}/api/v1/url/check"
+
+# One keep-alive session for every call (no new TCP connection per request);
+# transient connection errors and gateway/unavailable responses are retried
+RETRY = Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=RETRY))
+
+# Bodies are encoded/decoded with orjson rather than requests' stdlib json
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json(response):
+    """Decode a JSON response body with orjson."""
+    return orjson.loads(response.content)
 
-API_URL = "http://localhost:8000/api/v1/url/check"
 
 def test_whitelist():
     urls = [
@@ -13,14 +32,17 @@ def test_whitelist():
     for url in urls:
         print(f"Checking {url}...")
         try:
-            response = requests.post(API_URL, json={"url": url})
+            response = SESSION.post(
+                API_URL, params={"wait": "true"}, data=orjson.dumps({"url": url}), headers=JSON_HEADERS
+            )
             if response.status_code == 200:
-                data = response.json()
-                check_id = data["check_id"]
+                data = _json(response)
+                result = data.get("result")
                 
-                # Get result
-                result_response = requests.get(f"http://localhost:8000/api/v1/url/{check_id}")
-                result = result_response.json()
+                # Get result (only needed if the check was queued)
+                if result is None:
+                    check_id = data["check_id"]
+                    result = _json(SESSION.get(f"{API_BASE}/api/v1/url/{check_id}"))
                 
                 print(f"Verdict: {result['verdict']}")
                 print(f"Confidence: {result['confidence']}")
@@ -31,4 +53,5 @@ def test_whitelist():
             print(f"Failed: {e}")
 
 if __name__ == "__main__":
-    test_whitelist()
+    with SESSION:
+        test_whitelist()
@@ -1,85 +1,232 @@
-import requests
-import pandas as pd
+import argparse
+import asyncio
+import csv
+import os
 import random
 import time
-from tabulate import tabulate
 
-API_URL = "http://localhost:8000/api/v1/url/check"
+import httpx
+import numpy as np
+import orjson
+import pandas as pd
+import websockets
+from tqdm import tqdm
+
+# IP literal rather than localhost: no resolver (or IPv6 fallback) lookup per request
+BASE_URL = "http://127.0.0.1:8000"
+CHECK_PATH = "/api/v1/url/check"
+BATCH_PATH = "/api/v1/url/check_batch"
+WS_URL = "ws://127.0.0.1:8000/api/v1/url/ws"
+BATCH_SIZE = 100  # server-side limit per batch request
 TEST_DATA_PATH = "data/processed/test.csv"
+SAMPLE_PER_LABEL = 10
+
+# All checks share one client; requests beyond this many wait for a free
+# connection instead of opening more sockets
+CLIENT_LIMITS = httpx.Limits(max_connections=20)
+
+# Set API_HTTP2=1 when the API runs on an HTTP/2-capable server (e.g.
+# hypercorn): all requests then multiplex over one connection using h2
+# prior knowledge. uvicorn only speaks HTTP/1.1, so it stays the default.
+USE_HTTP2 = os.environ.get("API_HTTP2") == "1"
+
+# Failed connection attempts are retried by the transport instead of
+# dropping the URL from the results
+CONNECT_RETRIES = 3
+
+# Bodies are encoded/decoded with orjson rather than httpx's stdlib json
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Fixed-width result table
+RESULT_HEADERS = ("URL", "Expected", "Verdict", "Conf", "Top Features", "Correct", "Age (Days)", "Protocol")
+ROW_FORMAT = "{:<43} {:<10} {:<10} {:>5} {:<40} {:<7} {:>10} {:<8}"
+
+
+def _json(response):
+    """Decode a JSON response body with orjson."""
+    return orjson.loads(response.content)
+
+
+def make_client():
+    """Async client for the API with pooled, retrying connections."""
+    transport = httpx.AsyncHTTPTransport(
+        limits=CLIENT_LIMITS, retries=CONNECT_RETRIES, http1=not USE_HTTP2, http2=USE_HTTP2
+    )
+    return httpx.AsyncClient(base_url=BASE_URL, transport=transport, timeout=30.0)
+
 
-def validate_pipeline():
+async def fetch_result(client, url):
+    """Submit url with ?wait=true; fall back to a GET if it was only queued."""
+    response = await client.post(
+        CHECK_PATH, params={"wait": "true"}, content=orjson.dumps({"url": url}), headers=JSON_HEADERS
+    )
+    response.raise_for_status()
+    data = _json(response)
+    if data.get("result") is not None:
+        return data["result"]
+    return _json(await client.get(f"/api/v1/url/{data['check_id']}"))
+
+
+async def stream_checks(urls):
+    """
+    Submit every URL over one WebSocket and yield (index, result or None)
+    in the order the server finishes them.
+    """
+    async with websockets.connect(WS_URL) as ws:
+        for ref, url in enumerate(urls):
+            await ws.send(orjson.dumps({"url": url, "ref": ref}).decode())
+        for _ in range(len(urls)):
+            message = orjson.loads(await ws.recv())
+            yield message["ref"], message["result"]
+
+
+async def batch_checks(urls):
+    """Full checks via /check_batch, BATCH_SIZE per request; yields (index, result)."""
+    async with make_client() as client:
+        for start in range(0, len(urls), BATCH_SIZE):
+            batch = urls[start:start + BATCH_SIZE]
+            response = await client.post(BATCH_PATH, content=orjson.dumps({"urls": batch}), headers=JSON_HEADERS)
+            response.raise_for_status()
+            for offset, res in enumerate(_json(response)["results"]):
+                yield start + offset, res
+
+
+def result_row(display_url, expected_label, res):
+    """Table row for one checked URL (already truncated for display); returns (row, correct)."""
+    verdict = res['verdict']
+    confidence = res['confidence']
+    top_features = [f['name'] for f in res.get('top_features', [])[:2]]
+    additional_info = res.get('additional_info') or {}
+    
+    # Normalize verdict for comparison
+    # "suspicious" counts as "malicious" for phishing URLs
+    normalized_verdict = verdict
+    if verdict == "suspicious":
+        normalized_verdict = "malicious"
+    
+    is_correct = (normalized_verdict == expected_label)
+    domain_age = additional_info.get('domain_age_days', 'N/A')
+    
+    return [
+        display_url,
+        expected_label,
+        verdict,
+        f"{confidence:.2f}",
+        ", ".join(top_features),
+        "✅" if is_correct else "❌",
+        "" if domain_age is None else str(domain_age),
+        "HTTPS" if additional_info.get('is_https') else "HTTP"
+    ], is_correct
+
+
+async def check_heuristic(client, test):
+    """Check one heuristic test case; returns the line to print."""
+    url, expected, feature = test
+    try:
+        res = await fetch_result(client, url)
+        
+        verdict = res['verdict']
+        top_features = [f['name'] for f in res.get('top_features', [])]
+        add_info = res.get('additional_info', {})
+        
+        success = False
+        if feature == "is_whitelisted":
+            if add_info.get('is_whitelisted'):
+                success = True
+        elif any(feature in f for f in top_features):
+            success = True
+            
+        return f"  {url:<35} -> {verdict:<10} [{'✅' if success else '❌'}] (Expected: {feature})"
+        
+    except Exception as e:
+        return f"  {url:<35} -> ERROR: {e}"
+
+
+def reservoir_sample_by_label(path, k, seed=42):
+    """
+    Uniformly sample up to k URLs per label from a url,label CSV in one pass,
+    holding at most k rows per label in memory. Returns (row count, samples).
+    """
+    rng = random.Random(seed)
+    samples = {}
+    seen = {}
+    row_count = 0
+    
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        url_idx, label_idx = header.index('url'), header.index('label')
+        for row in reader:
+            row_count += 1
+            label = int(row[label_idx])
+            n = seen[label] = seen.get(label, 0) + 1
+            reservoir = samples.setdefault(label, [])
+            if n <= k:
+                reservoir.append(row[url_idx])
+            else:
+                j = rng.randrange(n)
+                if j < k:
+                    reservoir[j] = row[url_idx]
+    
+    return row_count, samples
+
+
+async def validate_pipeline(use_batch=False):
     print("🚀 Starting Real World Validation Pipeline...")
     
-    # 1. Load Test Data
+    # 1. Load Test Data and 2. Select Sample
+    # Get 10 benign and 10 phishing while streaming the file once
     try:
-        df = pd.read_csv(TEST_DATA_PATH)
-        print(f"✅ Loaded {len(df)} URLs from test set")
+        row_count, samples = reservoir_sample_by_label(TEST_DATA_PATH, SAMPLE_PER_LABEL)
+        print(f"✅ Loaded {row_count} URLs from test set")
     except Exception as e:
         print(f"❌ Failed to load test data: {e}")
         return
-
-    # 2. Select Sample
-    # Get 10 benign and 10 phishing
-    benign_sample = df[df['label'] == 0].sample(n=min(10, len(df[df['label'] == 0])), random_state=42)
-    phishing_sample = df[df['label'] == 1].sample(n=min(10, len(df[df['label'] == 1])), random_state=42)
     
-    sample = pd.concat([benign_sample, phishing_sample])
-    print(f"🧪 Testing {len(sample)} URLs ({len(benign_sample)} Benign, {len(phishing_sample)} Phishing)")
+    sample = pd.DataFrame(
+        [(url, label) for label in sorted(samples) for url in samples[label]],
+        columns=['url', 'label']
+    )
+    phishing_count = int((sample['label'] == 1).sum())
+    print(f"🧪 Testing {len(sample)} URLs ({len(sample) - phishing_count} Benign, {phishing_count} Phishing)")
+    
+    # Plain arrays: no per-row pandas objects, and the expected label is
+    # mapped for the whole sample at once
+    urls = sample['url'].to_numpy()
+    display_urls = (
+        sample['url'].str.slice(0, 40) + sample['url'].str.len().gt(40).map({True: "...", False: ""})
+    ).to_numpy()
+    expected_labels = np.where(sample['label'].to_numpy() == 1, "malicious", "benign")
     
-    results = []
     correct_count = 0
+    checked_count = 0
     
-    print("\nProcessing...", end="", flush=True)
+    # 3. Print Results
+    print()
+    print(ROW_FORMAT.format(*RESULT_HEADERS))
+    print("-" * len(ROW_FORMAT.format(*RESULT_HEADERS)))
     
-    for _, row in sample.iterrows():
-        url = row['url']
-        expected_label = "malicious" if row['label'] == 1 else "benign"
-        
+    # Streamed over one WebSocket by default (rows print as each check
+    # finishes); --batch sends BATCH_SIZE URLs per /check_batch request
+    checks = batch_checks(urls.tolist()) if use_batch else stream_checks(urls.tolist())
+    
+    # The bar (on stderr) redraws on a timer; rows go through tqdm.write
+    with tqdm(total=len(urls), desc="Validating", unit="url") as progress:
         try:
-            # Call API
-            response = requests.post(API_URL, json={"url": url})
-            if response.status_code == 200:
-                check_id = response.json()["check_id"]
-                
-                # Get result
-                res = requests.get(f"http://localhost:8000/api/v1/url/{check_id}").json()
-                
-                verdict = res['verdict']
-                confidence = res['confidence']
-                top_features = [f['name'] for f in res.get('top_features', [])[:2]]
-                additional_info = res.get('additional_info', {})
-                
-                # Normalize verdict for comparison
-                # "suspicious" counts as "malicious" for phishing URLs
-                normalized_verdict = verdict
-                if verdict == "suspicious":
-                    normalized_verdict = "malicious"
-                
-                is_correct = (normalized_verdict == expected_label)
-                if is_correct:
-                    correct_count += 1
-                
-                results.append([
-                    url[:40] + "..." if len(url) > 40 else url,
-                    expected_label,
-                    verdict,
-                    f"{confidence:.2f}",
-                    ", ".join(top_features),
-                    "✅" if is_correct else "❌",
-                    additional_info.get('domain_age_days', 'N/A'),
-                    "HTTPS" if additional_info.get('is_https') else "HTTP"
-                ])
-                print(".", end="", flush=True)
-            else:
-                print("E", end="", flush=True)
-        except Exception as e:
-            print("F", end="", flush=True)
-            
-    print("\n")
+            async for ref, res in checks:
+                progress.update()
+                if res is None:
+                    continue
+                row, is_correct = result_row(display_urls[ref], expected_labels[ref], res)
+                progress.write(ROW_FORMAT.format(*row))
+                checked_count += 1
+                correct_count += is_correct
+        except (OSError, httpx.HTTPError, websockets.WebSocketException) as e:
+            progress.write(f"❌ Checks failed: {e}")
     
-    # 3. Print Results
-    headers = ["URL", "Expected", "Verdict", "Conf", "Top Features", "Correct", "Age (Days)", "Protocol"]
-    print(tabulate(results, headers=headers, tablefmt="grid"))
+    failures = len(urls) - checked_count
+    if failures:
+        print(f"\n⚠️  {failures} checks failed")
     
     accuracy = (correct_count / len(sample)) * 100
     print(f"\n🏆 Overall Accuracy: {accuracy:.1f}%")
@@ -93,27 +240,12 @@ def validate_pipeline():
         ("http://non-existent-domain-123.com", "malicious", "invalid_dns")
     ]
     
-    for url, expected, feature in heuristic_tests:
-        try:
-            res = requests.post(API_URL, json={"url": url}).json()
-            check_id = res["check_id"]
-            res = requests.get(f"http://localhost:8000/api/v1/url/{check_id}").json()
-            
-            verdict = res['verdict']
-            top_features = [f['name'] for f in res.get('top_features', [])]
-            add_info = res.get('additional_info', {})
-            
-            success = False
-            if feature == "is_whitelisted":
-                if add_info.get('is_whitelisted'):
-                    success = True
-            elif any(feature in f for f in top_features):
-                success = True
-                
-            print(f"  {url:<35} -> {verdict:<10} [{'✅' if success else '❌'}] (Expected: {feature})")
-            
-        except Exception as e:
-            print(f"  {url:<35} -> ERROR: {e}")
+    async with make_client() as client:
+        for line in await asyncio.gather(*(check_heuristic(client, test) for test in heuristic_tests)):
+            print(line)
 
 if __name__ == "__main__":
-    validate_pipeline()
+    parser = argparse.ArgumentParser(description="Validate the API against a sample of the test set")
+    parser.add_argument("--batch", action="store_true", help="Use /check_batch instead of the WebSocket stream")
+    args = parser.parse_args()
+    asyncio.run(validate_pipeline(use_batch=args.batch))